@@ -0,0 +1,443 @@
+from __future__ import annotations
+
+DOCUMENTATION = """
+    name: elastic_bulk
+    type: notification
+    short_description: Ship task results and timings to Elasticsearch via the bulk API
+    description:
+      - Turns every task/host result into an NDJSON event and sends it to Elasticsearch
+        through the C(_bulk) endpoint in size- or time-bounded batches.
+      - Sending happens on a background thread; the callback hooks only enqueue a small
+        dict, so the play is never blocked on the network.
+      - When the endpoint is unreachable, batches are appended to a bounded local spool
+        file and replayed on the next successful flush or the next run.
+      - Optionally every event is also appended to a local NDJSON run log, which
+        C(tools/run_history.py) indexes alongside the C(make <target>-logged) text logs.
+    requirements:
+      - enable in configuration (C(callbacks_enabled = elastic_bulk))
+    options:
+      url:
+        description: Base URL of the Elasticsearch endpoint.
+        default: http://192.168.40.30:9200
+        env:
+          - name: ELASTIC_BULK_URL
+        ini:
+          - section: callback_elastic_bulk
+            key: url
+      index:
+        description: Index (or data stream) the events are written to.
+        default: ansible-runs
+        env:
+          - name: ELASTIC_BULK_INDEX
+        ini:
+          - section: callback_elastic_bulk
+            key: index
+      batch_size:
+        description: Flush once this many events are buffered.
+        type: int
+        default: 500
+        env:
+          - name: ELASTIC_BULK_BATCH_SIZE
+        ini:
+          - section: callback_elastic_bulk
+            key: batch_size
+      flush_interval:
+        description: Flush buffered events at least this often, in seconds.
+        type: float
+        default: 2.0
+        env:
+          - name: ELASTIC_BULK_FLUSH_INTERVAL
+        ini:
+          - section: callback_elastic_bulk
+            key: flush_interval
+      timeout:
+        description: HTTP timeout for a single bulk request, in seconds.
+        type: float
+        default: 3.0
+        env:
+          - name: ELASTIC_BULK_TIMEOUT
+        ini:
+          - section: callback_elastic_bulk
+            key: timeout
+      shutdown_timeout:
+        description: How long the end of the playbook waits for the final flush before spooling.
+        type: float
+        default: 10.0
+        env:
+          - name: ELASTIC_BULK_SHUTDOWN_TIMEOUT
+        ini:
+          - section: callback_elastic_bulk
+            key: shutdown_timeout
+      queue_size:
+        description: Maximum events held in memory; further events are dropped rather than blocking.
+        type: int
+        default: 20000
+        env:
+          - name: ELASTIC_BULK_QUEUE_SIZE
+        ini:
+          - section: callback_elastic_bulk
+            key: queue_size
+      spool_path:
+        description: NDJSON file that undeliverable events are written to.
+        type: path
+        default: logs/elastic-spool.ndjson
+        env:
+          - name: ELASTIC_BULK_SPOOL_PATH
+        ini:
+          - section: callback_elastic_bulk
+            key: spool_path
+      spool_max_bytes:
+        description: Upper bound on the spool size; the oldest events are discarded past it.
+        type: int
+        default: 52428800
+        env:
+          - name: ELASTIC_BULK_SPOOL_MAX_BYTES
+        ini:
+          - section: callback_elastic_bulk
+            key: spool_max_bytes
+      local_log:
+        description:
+          - NDJSON file every event is also appended to, whether or not it reaches Elasticsearch.
+          - Unset by default; C(make <target>-logged) points it next to the text log.
+        type: path
+        env:
+          - name: ELASTIC_BULK_LOCAL_LOG
+        ini:
+          - section: callback_elastic_bulk
+            key: local_log
+"""
+
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import uuid
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+
+from ansible.plugins.callback import CallbackBase
+
+_STOP = object()
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).isoformat()
+
+
+class BulkShipper:
+    """Background sender for NDJSON events with a bounded on-disk spool.
+
+    Only the worker thread touches the network and the spool file, so neither
+    needs locking. Callers interact through ``submit`` and ``close``.
+
+    Spooled events stay on disk until Elasticsearch acknowledges them: replay
+    records how far it got in ``<spool>.offset`` after every chunk, so a run
+    that dies mid-replay resumes from there instead of losing the spool.
+    """
+
+    # Extra time close() gives the worker to spool leftovers once sending stops
+    SHUTDOWN_GRACE = 5.0
+
+    def __init__(self, url, index, batch_size=500, flush_interval=2.0, timeout=3.0,
+                 queue_size=20000, spool_path="logs/elastic-spool.ndjson",
+                 spool_max_bytes=50 * 1024 * 1024, local_log=None):
+        self.bulk_url = url.rstrip("/") + "/_bulk"
+        self.action_line = json.dumps({"index": {"_index": index}}).encode() + b"\n"
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.spool_path = spool_path
+        self.offset_path = spool_path + ".offset" if spool_path else None
+        self.spool_max_bytes = spool_max_bytes
+        self.local_log = local_log
+        self.dropped = 0
+        self.sent = 0
+        self.spooled = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopping = threading.Event()
+        self._send_until = None
+        self._thread = threading.Thread(target=self._run, name="elastic-bulk", daemon=True)
+        self._thread.start()
+
+    def submit(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=10.0):
+        """Flush what is buffered and stop the worker.
+
+        The worker keeps sending for at most ``timeout`` seconds; after that it
+        spools everything it still holds, including a batch already in flight,
+        so no event is lost silently.
+        """
+        self._send_until = time.monotonic() + timeout
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_STOP)  # wake the worker if it is idle
+        except queue.Full:
+            pass
+        self._thread.join(timeout + self.SHUTDOWN_GRACE)
+
+    # -- worker thread -------------------------------------------------------
+
+    def _run(self):
+        local = self._open_local_log()
+        try:
+            self._process(local)
+        finally:
+            if local:
+                local.close()
+
+    def _open_local_log(self):
+        if not self.local_log:
+            return None
+        directory = os.path.dirname(self.local_log)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return open(self.local_log, "ab")
+
+    def _process(self, local):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        self._replay_spool()
+        while True:
+            wait = 0 if self._stopping.is_set() else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    self._flush(batch)
+                    return
+                item = None
+            if item is not None and item is not _STOP:
+                doc = json.dumps(item).encode()
+                batch.append(doc)
+                if local:
+                    local.write(doc + b"\n")
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                if batch and self._flush(batch):
+                    self._replay_spool()
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _flush(self, docs):
+        if not docs:
+            return True
+        retry = self._send(docs)
+        if retry is None:
+            self._spool(docs)
+            return False
+        self.sent += len(docs) - len(retry)
+        self._spool(retry)
+        return True
+
+    def _request_timeout(self):
+        """Per-request timeout, cut short once close() has started counting down."""
+        if self._send_until is None:
+            return self.timeout
+        return min(self.timeout, self._send_until - time.monotonic())
+
+    def _send(self, docs):
+        """POST one bulk request; return the docs to retry, or None if nothing was acknowledged."""
+        timeout = self._request_timeout()
+        if timeout <= 0:
+            return None
+        body = b"".join(self.action_line + doc + b"\n" for doc in docs)
+        request = urllib.request.Request(
+            self.bulk_url, data=body, method="POST",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                reply = json.loads(response.read() or b"{}")
+        except (urllib.error.URLError, socket.timeout, OSError, ValueError):
+            return None
+        retry = []
+        if reply.get("errors"):
+            # Only back-pressure rejections are worth retrying; mapping errors
+            # would fail again on replay, so count those as dropped.
+            for doc, item in zip(docs, reply.get("items", [])):
+                status = next(iter(item.values()), {}).get("status", 200)
+                if status == 429:
+                    retry.append(doc)
+                elif status >= 300:
+                    self.dropped += 1
+        return retry
+
+    def _spool(self, docs):
+        if self._append_spool(docs) and os.path.getsize(self.spool_path) > self.spool_max_bytes:
+            self._trim_spool()
+
+    def _append_spool(self, docs):
+        if not docs or not self.spool_path:
+            return False
+        payload = b"".join(doc + b"\n" for doc in docs)
+        directory = os.path.dirname(self.spool_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.spool_path, "ab") as spool:
+            spool.write(payload)
+        self.spooled += len(docs)
+        return True
+
+    def _trim_spool(self):
+        """Keep the newest unacknowledged events that fit in half the spool budget."""
+        offset = self._spool_offset()
+        start = max(offset, os.path.getsize(self.spool_path) - self.spool_max_bytes // 2)
+        with open(self.spool_path, "rb") as spool:
+            spool.seek(start)
+            if start > offset:
+                spool.readline()  # drop the partial event at the cut
+            tail = spool.read()
+        tmp = self.spool_path + ".tmp"
+        with open(tmp, "wb") as spool:
+            spool.write(tail)
+        os.replace(tmp, self.spool_path)
+        self._set_spool_offset(0)
+
+    def _spool_offset(self):
+        """Bytes at the head of the spool that Elasticsearch already acknowledged."""
+        try:
+            with open(self.offset_path) as f:
+                offset = int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+        return offset if offset <= os.path.getsize(self.spool_path) else 0
+
+    def _set_spool_offset(self, offset):
+        if not offset:
+            if os.path.exists(self.offset_path):
+                os.unlink(self.offset_path)
+            return
+        tmp = self.offset_path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp, self.offset_path)
+
+    def _replay_spool(self):
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return
+        end = os.path.getsize(self.spool_path)
+        with open(self.spool_path, "rb") as spool:
+            spool.seek(self._spool_offset())
+            while spool.tell() < end:
+                chunk = []
+                while len(chunk) < self.batch_size and spool.tell() < end:
+                    line = spool.readline()
+                    if line.strip():
+                        chunk.append(line.rstrip(b"\n"))
+                rejected = self._send(chunk) if chunk else []
+                if rejected is None:
+                    break
+                self.sent += len(chunk) - len(rejected)
+                # Re-queue 429s past ``end`` (this pass won't read them) before
+                # the offset moves beyond their original lines; no trimming
+                # here, it would shift the offsets being read
+                self._append_spool(rejected)
+                self._set_spool_offset(spool.tell())
+            else:
+                # Nothing appended meanwhile (by us or another run): all delivered
+                if os.path.getsize(self.spool_path) == end:
+                    os.unlink(self.spool_path)
+                    self._set_spool_offset(0)
+                    return
+        if os.path.getsize(self.spool_path) > self.spool_max_bytes:
+            self._trim_spool()
+
+
+class CallbackModule(CallbackBase):
+    """Send per-task results and play stats to the lab Elastic host."""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "notification"
+    CALLBACK_NAME = "elastic_bulk"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self, display=None):
+        super().__init__(display=display)
+        self.shipper = None
+        self.run_id = str(uuid.uuid4())
+        self.playbook = None
+        self.play = None
+        self.started = {}
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super().set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        self.shipper = BulkShipper(
+            url=self.get_option("url"),
+            index=self.get_option("index"),
+            batch_size=self.get_option("batch_size"),
+            flush_interval=self.get_option("flush_interval"),
+            timeout=self.get_option("timeout"),
+            queue_size=self.get_option("queue_size"),
+            spool_path=self.get_option("spool_path"),
+            spool_max_bytes=self.get_option("spool_max_bytes"),
+            local_log=self.get_option("local_log"),
+        )
+
+    def _emit(self, event_type, **fields):
+        event = {
+            "@timestamp": _utcnow(),
+            "event": event_type,
+            "run_id": self.run_id,
+            "playbook": self.playbook,
+            "play": self.play,
+        }
+        event.update(fields)
+        self.shipper.submit(event)
+
+    def _task_result(self, result, status):
+        host = result._host.get_name()
+        task = result._task
+        started = self.started.pop((host, task._uuid), None)
+        self._emit(
+            "task",
+            host=host,
+            task=task.get_name(),
+            action=task.action,
+            role=task._role.get_name() if task._role else None,
+            status=status,
+            changed=bool(result._result.get("changed", False)),
+            duration=round(time.monotonic() - started, 6) if started is not None else None,
+        )
+
+    def v2_playbook_on_start(self, playbook):
+        self.playbook = os.path.basename(playbook._file_name)
+        self._emit("playbook_start")
+
+    def v2_playbook_on_play_start(self, play):
+        self.play = play.get_name()
+
+    def v2_runner_on_start(self, host, task):
+        self.started[(host.get_name(), task._uuid)] = time.monotonic()
+
+    def v2_runner_on_ok(self, result):
+        self._task_result(result, "changed" if result._result.get("changed") else "ok")
+
+    def v2_runner_on_failed(self, result, ignore_errors=False):
+        self._task_result(result, "ignored" if ignore_errors else "failed")
+
+    def v2_runner_on_skipped(self, result):
+        self._task_result(result, "skipped")
+
+    def v2_runner_on_unreachable(self, result):
+        self._task_result(result, "unreachable")
+
+    def v2_playbook_on_stats(self, stats):
+        for host in sorted(stats.processed):
+            self._emit("host_summary", host=host, **stats.summarize(host))
+        self.shipper.close(timeout=self.get_option("shutdown_timeout"))
+        if self.shipper.dropped:
+            self._display.warning(
+                "elastic_bulk: dropped %d events (queue full or rejected by Elasticsearch)"
+                % self.shipper.dropped
+            )
+        if self.shipper.spooled:
+            self._display.vv(
+                "elastic_bulk: spooled %d events to %s" % (self.shipper.spooled, self.shipper.spool_path)
+            )
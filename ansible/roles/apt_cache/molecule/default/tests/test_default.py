@@ -0,0 +1,24 @@
+import os
+import testinfra.utils.ansible_runner
+
+testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
+    os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
+
+SNAPSHOT = {
+    "services": ["apt-cacher-ng"],
+    "contents": ["/etc/apt-cacher-ng/zz-lab.conf"],
+}
+
+
+def test_apt_cacher_ng_installed(snapshot):
+    assert snapshot.package("apt-cacher-ng").is_installed
+
+
+def test_apt_cacher_ng_config(snapshot):
+    config = snapshot.file("/etc/apt-cacher-ng/zz-lab.conf")
+    assert config.missing("Port: 3142", "ExThreshold: 14") == []
+
+
+def test_apt_cacher_ng_service(snapshot):
+    assert snapshot.service("apt-cacher-ng").state == {"enabled": True, "running": True}
+    assert snapshot.listening(3142)
@@ -4,39 +4,87 @@ import testinfra.utils.ansible_runner
 testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
 
+SNAPSHOT = {
+    "services": ["fail2ban"],
+    "files": ["/etc/passwd"],
+    "contents": [
+        "/etc/apt/apt.conf.d/50unattended-upgrades",
+        "/etc/ssh/sshd_config",
+        "/etc/fail2ban/jail.local",
+        "/etc/apt/apt.conf.d/20auto-upgrades",
+        "/etc/systemd/system/apt-daily.timer.d/override.conf",
+        "/etc/systemd/system/apt-daily-upgrade.timer.d/override.conf",
+        "/etc/systemd/system/apt-daily-upgrade.service.d/override.conf",
+        "/etc/timezone",
+    ],
+    "commands": ["ufw status"],
+}
 
-def test_passwd_file(host):
-    passwd = host.file("/etc/passwd")
-    assert passwd.contains("root")
+
+def test_passwd_file(snapshot):
+    passwd = snapshot.file("/etc/passwd")
+    assert passwd.exists
     assert passwd.user == "root"
     assert passwd.group == "root"
+    assert snapshot.user("root").exists
 
 
-def test_sshd_config(host):
-    sshd_config = host.file("/etc/ssh/sshd_config")
+def test_sshd_config(snapshot):
+    sshd_config = snapshot.file("/etc/ssh/sshd_config")
     assert sshd_config.exists
     assert sshd_config.contains("PasswordAuthentication no")
 
 
-def test_packages(host):
-    assert host.package("curl").is_installed
-    assert host.package("git").is_installed
-    assert host.package("ufw").is_installed
-    assert host.package("fail2ban").is_installed
-    assert host.package("unattended-upgrades").is_installed
+def test_packages(snapshot):
+    assert snapshot.missing_packages("curl", "git", "ufw", "fail2ban", "unattended-upgrades") == []
+
+
+def test_fail2ban_service(snapshot):
+    assert snapshot.service("fail2ban").state == {"enabled": True, "running": True}
 
 
-def test_fail2ban_service(host):
-    fail2ban = host.service("fail2ban")
-    assert fail2ban.is_enabled
-    assert fail2ban.is_running
+def test_fail2ban_journald_and_nftables(snapshot):
+    jail = snapshot.file("/etc/fail2ban/jail.local")
+    assert jail.missing(
+        "backend = systemd",
+        "banaction = nftables-multiport",
+        "bantime.increment = true",
+        "_SYSTEMD_UNIT=ssh.service",
+    ) == []
+    assert snapshot.missing_packages("nftables", "python3-systemd") == []
 
 
-def test_unattended_upgrades_config(host):
-    config = host.file("/etc/apt/apt.conf.d/50unattended-upgrades")
+def test_ufw_rules_applied(snapshot):
+    status = snapshot.command("ufw status").stdout
+    assert "Status: active" in status
+    assert "22/tcp" in status
+
+
+def test_unattended_upgrades_config(snapshot):
+    config = snapshot.file("/etc/apt/apt.conf.d/50unattended-upgrades")
     assert config.exists
-    assert config.contains('Unattended-Upgrade::Allowed-Origins')
+    assert config.contains("Unattended-Upgrade::Allowed-Origins")
+
+
+def test_unattended_upgrades_bounded(snapshot):
+    config = snapshot.file("/etc/apt/apt.conf.d/20auto-upgrades")
+    assert config.missing(
+        'Unattended-Upgrade::MinimalSteps "true"',
+        'Acquire::http::Dl-Limit "4096"',
+        'APT::Periodic::RandomSleep "0"',
+    ) == []
+
+
+def test_apt_timers_pinned(snapshot):
+    for timer in ("apt-daily.timer", "apt-daily-upgrade.timer"):
+        override = snapshot.file(f"/etc/systemd/system/{timer}.d/override.conf")
+        assert override.missing("RandomizedDelaySec=0", "OnCalendar=*-*-* ") == []
+
+
+def test_timezone(snapshot):
+    assert snapshot.file("/etc/timezone").contains("America/Los_Angeles")
 
 
-def test_timezone(host):
-    assert host.file("/etc/timezone").contains("America/Los_Angeles")
+def test_apt_runtime_ends_before_next_phase(snapshot):
+    override = snapshot.file("/etc/systemd/system/apt-daily-upgrade.service.d/override.conf")
+    assert override.contains("TimeoutStartSec=35min")
@@ -0,0 +1,34 @@
+import json
+import os
+import testinfra.utils.ansible_runner
+
+testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
+    os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
+
+SNAPSHOT = {
+    "services": ["docker", "docker-prune.timer"],
+    "contents": ["/etc/docker/daemon.json", "/usr/local/sbin/docker-prune"],
+}
+
+
+def test_daemon_json(snapshot):
+    config = json.loads(snapshot.file("/etc/docker/daemon.json").content_string)
+    assert config["registry-mirrors"] == ["http://192.168.40.20:5000"]
+    assert config["log-driver"] == "json-file"
+    assert config["log-opts"] == {"max-size": "10m", "max-file": "3"}
+    assert config["max-concurrent-downloads"] == 6
+    assert config["live-restore"] is True
+
+
+def test_docker_running(snapshot):
+    assert snapshot.service("docker").is_running
+
+
+def test_prune_script(snapshot):
+    script = snapshot.file("/usr/local/sbin/docker-prune")
+    assert script.mode == 0o755
+    assert script.contains("docker system prune --all --force")
+
+
+def test_prune_timer(snapshot):
+    assert snapshot.service("docker-prune.timer").state == {"enabled": True, "running": True}
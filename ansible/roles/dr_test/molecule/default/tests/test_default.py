@@ -4,20 +4,24 @@ import testinfra.utils.ansible_runner
 testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
 
+SNAPSHOT = {
+    "files": ["/srv/backup/repo/config", "/tmp/dr-test-source"],
+    "contents": ["/var/log/dr-test.log"],
+}
 
-def test_dr_test_log_created(host):
-    assert host.file("/var/log/dr-test.log").exists
 
+def test_dr_test_log_created(snapshot):
+    assert snapshot.file("/var/log/dr-test.log").exists
 
-def test_dr_test_log_records_pass(host):
-    log = host.file("/var/log/dr-test.log").content_string
-    assert "DR test PASSED" in log
-    assert "backup and restore" in log
 
+def test_dr_test_log_records_pass(snapshot):
+    log = snapshot.file("/var/log/dr-test.log")
+    assert log.missing("DR test PASSED", "backup and restore") == []
 
-def test_restic_repo_initialized(host):
-    assert host.file("/srv/backup/repo/config").exists
 
+def test_restic_repo_initialized(snapshot):
+    assert snapshot.file("/srv/backup/repo/config").exists
 
-def test_canary_source_cleaned_up(host):
-    assert not host.file("/tmp/dr-test-source").exists
+
+def test_canary_source_cleaned_up(snapshot):
+    assert not snapshot.file("/tmp/dr-test-source").exists
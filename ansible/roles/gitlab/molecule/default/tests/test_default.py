@@ -4,16 +4,31 @@ import testinfra.utils.ansible_runner
 testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
 
+SNAPSHOT = {
+    "files": ["/etc/apt/sources.list.d/gitlab_gitlab-ce.list"],
+    "contents": ["/etc/gitlab/gitlab.rb"],
+}
 
-def test_gitlab_dependencies(host):
-    assert host.package("curl").is_installed
-    assert host.package("openssh-server").is_installed
-    assert host.package("ca-certificates").is_installed
 
+def test_gitlab_dependencies(snapshot):
+    assert snapshot.missing_packages("curl", "openssh-server", "ca-certificates") == []
 
-def test_gitlab_repository(host):
-    assert host.file("/etc/apt/sources.list.d/gitlab_gitlab-ce.list").exists
 
+def test_gitlab_repository(snapshot):
+    assert snapshot.file("/etc/apt/sources.list.d/gitlab_gitlab-ce.list").exists
 
-def test_gitlab_ce_installed(host):
-    assert host.package("gitlab-ce").is_installed
+
+def test_gitlab_ce_installed(snapshot):
+    assert snapshot.package("gitlab-ce").is_installed
+
+
+def test_gitlab_rb_managed(snapshot):
+    config = snapshot.file("/etc/gitlab/gitlab.rb")
+    assert config.mode == 0o600
+    assert config.missing(
+        "Managed by Ansible",
+        "puma['worker_processes']",
+        "sidekiq['concurrency']",
+        "postgresql['shared_buffers']",
+        "max_per_repo:",
+    ) == []
@@ -4,20 +4,47 @@ import testinfra.utils.ansible_runner
 testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
 
+SNAPSHOT = {
+    "contents": ["/etc/gitlab-runner/config.toml"],
+}
 
-def test_gitlab_runner_installed(host):
-    assert host.package("gitlab-runner").is_installed
 
+def test_gitlab_runner_installed(snapshot):
+    assert snapshot.package("gitlab-runner").is_installed
 
-def test_runner_registration(host):
-    assert host.file("/etc/gitlab-runner/config.toml").exists
 
+def test_runner_registration(snapshot):
+    assert snapshot.file("/etc/gitlab-runner/config.toml").exists
 
-def test_runner_executor(host):
-    config = host.file("/etc/gitlab-runner/config.toml")
-    assert config.contains('executor = "docker"')
 
+def test_runner_executor(snapshot):
+    assert snapshot.file("/etc/gitlab-runner/config.toml").contains('executor = "docker"')
 
-def test_runner_description(host):
-    config = host.file("/etc/gitlab-runner/config.toml")
-    assert config.contains('name = "instance-runner"')
+
+def test_runner_description(snapshot):
+    assert snapshot.file("/etc/gitlab-runner/config.toml").contains('name = "instance-runner"')
+
+
+def test_runner_token_preserved(snapshot):
+    config = snapshot.file("/etc/gitlab-runner/config.toml")
+    assert config.contains('token = "REPLACE_ME"')
+    assert config.mode == 0o600
+
+
+def test_runner_concurrency_matches_limit(snapshot):
+    content = snapshot.file("/etc/gitlab-runner/config.toml").content_string
+    values = dict(
+        line.strip().split(" = ", 1) for line in content.splitlines()
+        if line.strip().startswith(("concurrent =", "limit ="))
+    )
+    assert int(values["concurrent"]) >= 1
+    assert values["limit"] == values["concurrent"]
+
+
+def test_runner_docker_tuning(snapshot):
+    config = snapshot.file("/etc/gitlab-runner/config.toml")
+    assert config.missing(
+        'pull_policy = ["if-not-present"]',
+        'cpus = "2"',
+        'memory = "2048m"',
+    ) == []
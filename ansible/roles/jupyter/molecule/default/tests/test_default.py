@@ -1,15 +1,51 @@
+import json
 import os
 import testinfra.utils.ansible_runner
 
 testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
 
+SNAPSHOT = {
+    "files": ["/opt/jupyterlab/bin/jupyter", "/usr/local/bin/jupyter", "/var/cache/jupyter-wheels"],
+    "contents": [
+        "/etc/systemd/system/jupyterlab.service",
+        "/opt/jupyterlab/etc/jupyter/jupyter_server_config.json",
+    ],
+    "commands": ["which jupyter", "/usr/bin/python3 -c 'import jupyterlab'"],
+}
 
-def test_jupyterlab_installed(host):
-    assert host.run("which jupyter").rc == 0
 
+def test_jupyterlab_installed(snapshot):
+    assert snapshot.command("which jupyter").rc == 0
 
-def test_jupyterlab_service(host):
-    unit = host.file("/etc/systemd/system/jupyterlab.service")
+
+def test_jupyterlab_in_venv(snapshot):
+    assert snapshot.file("/opt/jupyterlab/bin/jupyter").exists
+    link = snapshot.file("/usr/local/bin/jupyter")
+    assert link.is_symlink
+    assert link.linked_to == "/opt/jupyterlab/bin/jupyter"
+    assert snapshot.command("/usr/bin/python3 -c 'import jupyterlab'").rc != 0
+
+
+def test_wheel_cache_populated(snapshot):
+    cache = snapshot.file("/var/cache/jupyter-wheels")
+    assert cache.is_directory
+    assert any(name.startswith("jupyterlab-") and name.endswith(".whl") for name in cache.listdir())
+
+
+def test_jupyterlab_service(snapshot):
+    unit = snapshot.file("/etc/systemd/system/jupyterlab.service")
     assert unit.exists
-    assert unit.contains("ExecStart=/usr/bin/jupyter lab")
+    assert unit.missing(
+        "ExecStart=/opt/jupyterlab/bin/jupyter lab",
+        "MemoryMax=4G",
+        "CPUQuota=200%",
+        "TasksMax=512",
+    ) == []
+
+
+def test_culling_configured(snapshot):
+    config = json.loads(snapshot.file("/opt/jupyterlab/etc/jupyter/jupyter_server_config.json").content_string)
+    assert config["MappingKernelManager"]["cull_idle_timeout"] == 3600
+    assert config["TerminalManager"]["cull_inactive_timeout"] == 3600
+    assert config["ServerApp"]["max_buffer_size"] == 268435456
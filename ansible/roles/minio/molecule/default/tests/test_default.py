@@ -0,0 +1,41 @@
+import os
+import testinfra.utils.ansible_runner
+
+testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
+    os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
+
+SNAPSHOT = {
+    "services": ["minio"],
+    "files": ["/usr/local/bin/minio", "/usr/local/bin/mc", "/srv/minio/runner-cache"],
+    "contents": ["/etc/default/minio", "/etc/minio/policies/molecule-cache.json"],
+    "commands": ["mc admin user info local molecule-cache"],
+}
+
+
+def test_minio_binaries(snapshot):
+    assert snapshot.file("/usr/local/bin/minio").mode == 0o755
+    assert snapshot.file("/usr/local/bin/mc").mode == 0o755
+
+
+def test_minio_service(snapshot):
+    assert snapshot.service("minio").state == {"enabled": True, "running": True}
+
+
+def test_minio_env_not_world_readable(snapshot):
+    env = snapshot.file("/etc/default/minio")
+    assert env.mode == 0o600
+    assert env.contains("MINIO_VOLUMES=/srv/minio")
+
+
+def test_runner_cache_bucket(snapshot):
+    assert snapshot.file("/srv/minio/runner-cache").is_directory
+
+
+def test_service_account_scoped_to_its_bucket(snapshot):
+    policy = snapshot.file("/etc/minio/policies/molecule-cache.json")
+    assert policy.mode == 0o600
+    assert policy.missing('"arn:aws:s3:::runner-cache"', '"arn:aws:s3:::runner-cache/*"') == []
+    assert not policy.contains('"arn:aws:s3:::*"')
+    info = snapshot.command("mc admin user info local molecule-cache")
+    assert info.rc == 0
+    assert "molecule-cache-buckets" in info.stdout
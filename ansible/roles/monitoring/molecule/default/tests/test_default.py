@@ -5,18 +5,25 @@ testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
 
 ELASTIC_AGENT_VERSION = "8.15.3"
+AGENT_DIR = f"/opt/elastic-agent-{ELASTIC_AGENT_VERSION}-linux-x86_64"
 
+SNAPSHOT = {
+    "files": [
+        f"/tmp/elastic-agent-{ELASTIC_AGENT_VERSION}-linux-x86_64.tar.gz",
+        AGENT_DIR,
+        f"{AGENT_DIR}/elastic-agent",
+    ],
+}
 
-def test_elastic_agent_downloaded(host):
+
+def test_elastic_agent_downloaded(snapshot):
     tarball = f"/tmp/elastic-agent-{ELASTIC_AGENT_VERSION}-linux-x86_64.tar.gz"
-    assert host.file(tarball).exists
+    assert snapshot.file(tarball).exists
 
 
-def test_elastic_agent_extracted(host):
-    extracted = f"/opt/elastic-agent-{ELASTIC_AGENT_VERSION}-linux-x86_64"
-    assert host.file(extracted).is_directory
+def test_elastic_agent_extracted(snapshot):
+    assert snapshot.file(AGENT_DIR).is_directory
 
 
-def test_elastic_agent_binary_present(host):
-    binary = f"/opt/elastic-agent-{ELASTIC_AGENT_VERSION}-linux-x86_64/elastic-agent"
-    assert host.file(binary).exists
+def test_elastic_agent_binary_present(snapshot):
+    assert snapshot.file(f"{AGENT_DIR}/elastic-agent").exists
@@ -4,26 +4,29 @@ import testinfra.utils.ansible_runner
 testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
 
+SNAPSHOT = {
+    "contents": ["/etc/dnsmasq.d/lab.conf", "/etc/netplan/99-lab-vlans.yaml"],
+}
 
-def test_network_packages(host):
-    assert host.package("dnsmasq").is_installed
-    assert host.package("unbound").is_installed
 
+def test_network_packages(snapshot):
+    assert snapshot.missing_packages("dnsmasq", "unbound") == []
 
-def test_dhcp_ranges(host):
-    config = host.file("/etc/dnsmasq.d/lab.conf")
+
+def test_dhcp_ranges(snapshot):
+    config = snapshot.file("/etc/dnsmasq.d/lab.conf")
     assert config.exists
-    assert config.contains("dhcp-range=192.168.50.100,192.168.50.200,12h")
-    assert config.contains("dhcp-range=192.168.60.100,192.168.60.200,12h")
+    assert config.missing(
+        "dhcp-range=192.168.50.100,192.168.50.200,12h",
+        "dhcp-range=192.168.60.100,192.168.60.200,12h",
+    ) == []
 
 
-def test_dns_domain(host):
-    config = host.file("/etc/dnsmasq.d/lab.conf")
-    assert config.contains("domain=lab.local")
+def test_dns_domain(snapshot):
+    assert snapshot.file("/etc/dnsmasq.d/lab.conf").contains("domain=lab.local")
 
 
-def test_vlan_configuration(host):
-    config = host.file("/etc/netplan/99-lab-vlans.yaml")
+def test_vlan_configuration(snapshot):
+    config = snapshot.file("/etc/netplan/99-lab-vlans.yaml")
     assert config.exists
-    assert config.contains("vlan50:")
-    assert config.contains("vlan60:")
+    assert config.missing("vlan50:", "vlan60:") == []
@@ -0,0 +1,27 @@
+import os
+import testinfra.utils.ansible_runner
+
+testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
+    os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
+
+SNAPSHOT = {
+    "services": ["docker-registry"],
+    "contents": ["/etc/docker/registry/config.yml"],
+}
+
+
+def test_registry_installed(snapshot):
+    assert snapshot.package("docker-registry").is_installed
+
+
+def test_registry_proxy_config(snapshot):
+    config = snapshot.file("/etc/docker/registry/config.yml")
+    assert config.missing("remoteurl: https://registry-1.docker.io", "addr: :5000") == []
+
+
+def test_registry_service(snapshot):
+    assert snapshot.service("docker-registry").state == {"enabled": True, "running": True}
+
+
+def test_registry_listening(snapshot):
+    assert snapshot.listening(5000)
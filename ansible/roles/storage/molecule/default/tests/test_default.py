@@ -4,21 +4,25 @@ import testinfra.utils.ansible_runner
 testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
 
+SNAPSHOT = {
+    "files": ["/srv/nfs", "/srv/backup/repo/config"],
+    "contents": ["/etc/exports.d/lab.exports"],
+}
 
-def test_storage_packages(host):
-    assert host.package("nfs-kernel-server").is_installed
-    assert host.package("restic").is_installed
 
+def test_storage_packages(snapshot):
+    assert snapshot.missing_packages("nfs-kernel-server", "restic") == []
 
-def test_nfs_export_directory(host):
-    assert host.file("/srv/nfs").is_directory
 
+def test_nfs_export_directory(snapshot):
+    assert snapshot.file("/srv/nfs").is_directory
 
-def test_nfs_exports(host):
-    exports = host.file("/etc/exports.d/lab.exports")
+
+def test_nfs_exports(snapshot):
+    exports = snapshot.file("/etc/exports.d/lab.exports")
     assert exports.exists
     assert exports.contains("/srv/nfs 192.168.0.0/16(rw,sync,no_subtree_check)")
 
 
-def test_restic_repository(host):
-    assert host.file("/srv/backup/repo/config").exists
+def test_restic_repository(snapshot):
+    assert snapshot.file("/srv/backup/repo/config").exists
@@ -4,11 +4,15 @@ import testinfra.utils.ansible_runner
 testinfra_hosts = testinfra.utils.ansible_runner.AnsibleRunner(
     os.environ['MOLECULE_INVENTORY_FILE']).get_hosts('all')
 
+SNAPSHOT = {
+    "services": ["code-server@molecule"],
+    "files": ["/usr/bin/code-server"],
+}
 
-def test_vscode_server_installed(host):
-    assert host.file("/usr/bin/code-server").exists
 
+def test_vscode_server_installed(snapshot):
+    assert snapshot.file("/usr/bin/code-server").exists
 
-def test_vscode_server_service(host):
-    service = host.service("code-server@molecule")
-    assert service.is_enabled
+
+def test_vscode_server_service(snapshot):
+    assert snapshot.service("code-server@molecule").is_enabled
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Measure execve throughput under each auditd profile.
+
+Renders every profile in group_vars/all.yml through the same template
+hardening.yml uses, then runs a privileged container that loads each rule
+set in turn and times a posix_spawn(/bin/true) loop. Each profile is run
+twice: once with an unset login uid (daemon-spawned work such as CI jobs
+under dockerd) and once with a login uid of 1000 (an interactive user).
+
+The audit subsystem is not namespaced: the container changes the rules of
+the kernel it runs on. Current rules and backlog/rate settings are saved
+first and restored afterwards, but run this on a disposable VM or CI host,
+not on a production machine.
+
+    python benchmarks/auditd_execve.py --output logs/auditd-execve.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+TEMPLATE = ROOT / "ansible/playbooks/templates/audit-rules.j2"
+GROUP_VARS = ROOT / "group_vars/all.yml"
+DEFAULT_IMAGE = "geerlingguy/docker-ubuntu2204-ansible:latest"
+# Stand-in uid for exec_exclude_users so the "never" rules are evaluated
+EXCLUDED_UID = 4242
+SCENARIOS = {"daemon": None, "interactive": 1000}
+
+
+def render_profiles(out_dir):
+    import jinja2
+    import yaml
+
+    with open(GROUP_VARS) as f:
+        group_vars = yaml.safe_load(f)
+    template = jinja2.Template(TEMPLATE.read_text(), trim_blocks=True)
+    for name, profile in group_vars["auditd_profiles"].items():
+        exclude = [EXCLUDED_UID] if profile["exec_exclude_users"] else []
+        rules = template.render(auditd_profile=name, audit_profile=profile, audit_exclude_uids=exclude)
+        (out_dir / f"{name}.rules").write_text(rules)
+    return sorted(group_vars["auditd_profiles"])
+
+
+def run_container(args):
+    docker = shutil.which("docker")
+    if not docker:
+        sys.exit("docker is required to run the benchmark")
+    with tempfile.TemporaryDirectory(prefix="auditd-bench-") as tmp:
+        work = Path(tmp)
+        profiles = render_profiles(work)
+        shutil.copy(__file__, work / "auditd_execve.py")
+        inner = (
+            "apt-get update -qq && apt-get install -y -qq auditd >/dev/null && "
+            f"python3 /bench/auditd_execve.py --in-container /bench "
+            f"--iterations {args.iterations} --workers {args.workers} --repeat {args.repeat} "
+            f"--profiles {' '.join(profiles)}"
+        )
+        result = subprocess.run(
+            [docker, "run", "--rm", "--privileged", "--pid=host", "-v", f"{work}:/bench",
+             args.image, "bash", "-c", inner],
+            check=True, stdout=subprocess.PIPE, text=True,
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+# -- inside the container ---------------------------------------------------
+
+def auditctl(*argv, check=True):
+    return subprocess.run(["auditctl", *argv], check=check, capture_output=True, text=True).stdout
+
+
+def audit_status():
+    return dict(line.split(" ", 1) for line in auditctl("-s").splitlines() if " " in line)
+
+
+def spawn_worker(iterations, loginuid, start, results):
+    if loginuid is not None:
+        with open("/proc/self/loginuid", "w") as f:
+            f.write(str(loginuid))
+    start.wait()
+    began = time.perf_counter()
+    for _ in range(iterations):
+        pid = os.posix_spawn("/bin/true", ["/bin/true"], {})
+        os.waitpid(pid, 0)
+    results.put(time.perf_counter() - began)
+
+
+def measure(iterations, workers, loginuid):
+    start = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(target=spawn_worker, args=(iterations, loginuid, start, results))
+        for _ in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+    began = time.perf_counter()
+    start.set()
+    for proc in procs:
+        proc.join()
+    elapsed = time.perf_counter() - began
+    return iterations * workers / elapsed
+
+
+def load_rules(path):
+    auditctl("-D")
+    if path is not None:
+        auditctl("-R", str(path))
+    auditctl("-e", "1")
+
+
+def in_container(args):
+    bench = Path(args.in_container)
+    saved_rules = auditctl("-l")
+    saved = audit_status()
+    results = {"iterations": args.iterations, "workers": args.workers, "repeat": args.repeat, "profiles": {}}
+    try:
+        for profile in ["baseline", *args.profiles]:
+            load_rules(None if profile == "baseline" else bench / f"{profile}.rules")
+            lost_before = int(audit_status().get("lost", 0))
+            runs = {}
+            for scenario, loginuid in SCENARIOS.items():
+                samples = [measure(args.iterations, args.workers, loginuid) for _ in range(args.repeat)]
+                runs[scenario] = {"execs_per_sec": round(statistics.median(samples), 1)}
+            runs["lost_records"] = int(audit_status().get("lost", 0)) - lost_before
+            results["profiles"][profile] = runs
+    finally:
+        auditctl("-D")
+        rules = [line for line in saved_rules.splitlines() if line.startswith(("-a", "-w"))]
+        if rules:
+            restore = bench / "restore.rules"
+            restore.write_text("\n".join(rules) + "\n")
+            auditctl("-R", str(restore), check=False)
+        auditctl("-b", saved.get("backlog_limit", "8192"), check=False)
+        auditctl("-r", saved.get("rate_limit", "0"), check=False)
+        auditctl("--backlog_wait_time", saved.get("backlog_wait_time", "60000"), check=False)
+        auditctl("-e", saved.get("enabled", "1"), check=False)
+
+    baseline = results["profiles"]["baseline"]
+    for runs in results["profiles"].values():
+        for scenario in SCENARIOS:
+            base = baseline[scenario]["execs_per_sec"]
+            runs[scenario]["overhead_pct"] = round(100 * (1 - runs[scenario]["execs_per_sec"] / base), 1)
+    print(json.dumps(results))
+
+
+def print_table(results):
+    print(f"{'profile':<12} {'scenario':<12} {'execs/s':>10} {'overhead':>9}")
+    for profile, runs in results["profiles"].items():
+        for scenario in SCENARIOS:
+            run = runs[scenario]
+            print(f"{profile:<12} {scenario:<12} {run['execs_per_sec']:>10.1f} {run['overhead_pct']:>8.1f}%")
+        if runs["lost_records"]:
+            print(f"{'':<12} lost audit records: {runs['lost_records']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000, help="spawns per worker per sample")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3, help="samples per scenario (median is reported)")
+    parser.add_argument("--image", default=DEFAULT_IMAGE)
+    parser.add_argument("--output", help="also write results as JSON to this path")
+    parser.add_argument("--in-container", help=argparse.SUPPRESS)
+    parser.add_argument("--profiles", nargs="*", default=[], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.in_container:
+        in_container(args)
+        return
+
+    results = run_container(args)
+    print_table(results)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
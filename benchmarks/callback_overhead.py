@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""Measure what the elastic_bulk callback adds to playbook wall time at high fork counts.
+
+Generates a throwaway project with N local hosts (ansible_connection=local)
+and a playbook of M debug tasks, then times ansible-playbook at each fork
+count in three modes:
+
+    off    callback not enabled (the reference)
+    on     callback shipping to a local stand-in _bulk endpoint
+    down   callback pointed at a closed port, so every batch is spooled
+
+debug tasks do almost no work, so the callback's share of the run is as
+large as it gets; real plays see less. --check exits non-zero when "on" or
+"down" is more than --max-overhead percent slower than "off".
+
+    python benchmarks/callback_overhead.py --hosts 500 --forks 50 100
+    python benchmarks/callback_overhead.py --check --max-overhead 10
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+CALLBACK_DIR = ROOT / "ansible/plugins/callback"
+MODES = ("off", "on", "down")
+
+
+class StandInElastic(ThreadingHTTPServer):
+    """_bulk endpoint that acknowledges every document and counts them."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), BulkHandler)
+        self.docs = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class BulkHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        docs = body.count(b"\n") // 2
+        with self.server.lock:
+            self.server.docs += docs
+        reply = json.dumps({"errors": False, "items": [{"index": {"status": 201}}] * docs}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+def closed_port():
+    """A local port with nothing listening on it."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# -- generation ---------------------------------------------------------------
+
+def write_project(tree, hosts, tasks):
+    """Inventory of ``hosts`` local hosts, a playbook of ``tasks`` debug tasks and an ansible.cfg."""
+    inventory = ["[bench]"] + [f"bench-{i:05d}" for i in range(1, hosts + 1)]
+    inventory += ["", "[bench:vars]", "ansible_connection=local", f"ansible_python_interpreter={sys.executable}"]
+    (tree / "hosts.ini").write_text("\n".join(inventory) + "\n")
+    playbook = ["- name: Callback overhead", "  hosts: bench", "  gather_facts: false", "  tasks:"]
+    for i in range(1, tasks + 1):
+        playbook += [f"    - name: Task {i}", "      ansible.builtin.debug:",
+                     f"        msg: \"{{{{ inventory_hostname }}}} {i}\""]
+    (tree / "play.yml").write_text("\n".join(playbook) + "\n")
+    (tree / "ansible.cfg").write_text(
+        "[defaults]\n"
+        "inventory = ./hosts.ini\n"
+        "host_key_checking = False\n"
+        "retry_files_enabled = False\n"
+        f"callback_plugins = {CALLBACK_DIR}\n"
+        "\n"
+        "[callback_elastic_bulk]\n"
+        "spool_path = ./spool.ndjson\n"
+    )
+
+
+# -- measurement --------------------------------------------------------------
+
+def ansible_env(tree, mode, url):
+    env = {name: value for name, value in os.environ.items()
+           if not name.startswith(("ELASTIC_BULK_", "ANSIBLE_"))}
+    env.update(ANSIBLE_CONFIG=str(tree / "ansible.cfg"), ANSIBLE_NOCOLOR="1")
+    if mode != "off":
+        env.update(ANSIBLE_CALLBACKS_ENABLED="elastic_bulk", ELASTIC_BULK_URL=url)
+    return env
+
+
+def timed_run(tree, forks, mode, url):
+    (tree / "spool.ndjson").unlink(missing_ok=True)
+    (tree / "spool.ndjson.offset").unlink(missing_ok=True)
+    began = time.perf_counter()
+    proc = subprocess.run(["ansible-playbook", "--forks", str(forks), "play.yml"], cwd=tree,
+                          env=ansible_env(tree, mode, url), stdin=subprocess.DEVNULL,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    seconds = time.perf_counter() - began
+    if proc.returncode != 0:
+        raise RuntimeError(f"ansible-playbook failed ({mode}, {forks} forks): {proc.stderr.strip()}")
+    return seconds
+
+
+def benchmark(hosts, tasks, forks_list, repeat, modes=MODES):
+    results = {"hosts": hosts, "tasks": tasks, "repeat": repeat, "runs": []}
+    server = StandInElastic()
+    urls = {"off": "", "on": server.url, "down": f"http://127.0.0.1:{closed_port()}"}
+    try:
+        with tempfile.TemporaryDirectory(prefix="callback-bench-") as tmp:
+            tree = Path(tmp)
+            write_project(tree, hosts, tasks)
+            for forks in forks_list:
+                samples = {mode: [] for mode in modes}
+                shipped = {mode: 0 for mode in modes}
+                # Modes alternate within each round so drift hits them alike
+                for _ in range(repeat):
+                    for mode in modes:
+                        before = server.docs
+                        samples[mode].append(timed_run(tree, forks, mode, urls[mode]))
+                        shipped[mode] += server.docs - before
+                for mode in modes:
+                    results["runs"].append({
+                        "forks": forks,
+                        "mode": mode,
+                        "seconds": round(statistics.median(samples[mode]), 3),
+                        "events_shipped": shipped[mode] // repeat,
+                    })
+    finally:
+        server.stop()
+
+    for forks in forks_list:
+        runs = [r for r in results["runs"] if r["forks"] == forks]
+        base = next((r["seconds"] for r in runs if r["mode"] == "off"), None)
+        for r in runs:
+            r["overhead_pct"] = round(100 * (r["seconds"] / base - 1), 1) if base else None
+    return results
+
+
+def over_budget(results, max_overhead):
+    """Runs whose overhead against "off" exceeds ``max_overhead`` percent."""
+    return [r for r in results["runs"] if r["overhead_pct"] is not None and r["overhead_pct"] > max_overhead]
+
+
+def print_table(results):
+    print(f"{results['hosts']} hosts x {results['tasks']} tasks, median of {results['repeat']}")
+    print(f"{'forks':>5} {'mode':<5} {'seconds':>8} {'overhead':>9} {'events':>7}")
+    for r in results["runs"]:
+        overhead = "-" if r["overhead_pct"] is None else f"{r['overhead_pct']:+.1f}%"
+        print(f"{r['forks']:>5} {r['mode']:<5} {r['seconds']:>8.2f} {overhead:>9} {r['events_shipped']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=100)
+    parser.add_argument("--tasks", type=int, default=10)
+    parser.add_argument("--forks", type=int, nargs="+", default=[50, 100])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--repeat", type=int, default=3, help="runs per fork count and mode (median is reported)")
+    parser.add_argument("--max-overhead", type=float, default=10.0,
+                        help="percent slowdown against \"off\" that --check allows")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any mode exceeds --max-overhead")
+    parser.add_argument("--output", help="also write results as JSON to this path")
+    args = parser.parse_args()
+
+    if not shutil.which("ansible-playbook"):
+        sys.exit("ansible-playbook is required to run the benchmark")
+
+    results = benchmark(args.hosts, args.tasks, args.forks, args.repeat, args.modes)
+    print_table(results)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    if args.check and over_budget(results, args.max_overhead):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""Time inventory loading, play planning and variable templating at fleet scale.
+
+Generates a copy of the repo layout with a synthetic inventory of N hosts
+(the real infra hosts that group_vars reference by name, plus generated
+workstations, lab nodes and runners), a host_vars file per host, and
+vault-encrypted group_vars/host_vars holding every vault_* variable the
+real vars files reference. For each size it then measures, with no
+connections to any host:
+
+    ansible-inventory --list
+    ansible-playbook --list-hosts --list-tasks   (every playbook)
+    templating every inventory variable of every host (Ansible Python API)
+
+Results are written as JSON and compared with a stored baseline; --check
+exits non-zero when any metric regressed past the tolerance, a playbook that
+planned in the baseline now fails, or the baseline has no entry for a size.
+
+    python benchmarks/fleet_scale.py --sizes 100 1000 5000 20000
+    python benchmarks/fleet_scale.py --sizes 1000 --check
+    python benchmarks/fleet_scale.py --update-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE = ROOT / "benchmarks/baselines/fleet_scale.json"
+VAULT_PASSWORD = "fleet-bench"
+# Referenced by name from group_vars (hostvars['nfs'], hostvars['gitlab'])
+INFRA_HOSTS = ["gitlab", "nfs", "elastic", "dnsdhcp"]
+# Share of the generated hosts per group, roughly the lab's mix
+GROUP_SHARE = {"workstations": 0.35, "lab_nodes": 0.3, "runners": 0.3, "infra": 0.05}
+GROUP_PREFIX = {"workstations": "ws", "lab_nodes": "pi", "runners": "runner", "infra": "infra"}
+VAULT_REF = re.compile(r"\bvault_\w+")
+# Regressions smaller than this many seconds are treated as noise
+MIN_DELTA = 0.2
+
+
+# -- generation ---------------------------------------------------------------
+
+def fleet(size):
+    """Group -> host names for a fleet of ``size`` hosts."""
+    spare = max(0, size - len(INFRA_HOSTS))
+    counts = {group: int(spare * share) for group, share in GROUP_SHARE.items()}
+    # Rounding leftovers go to workstations
+    counts["workstations"] += spare - sum(counts.values())
+    groups = {
+        group: [f"{GROUP_PREFIX[group]}-{i:05d}" for i in range(1, count + 1)]
+        for group, count in counts.items()
+    }
+    groups["infra"] = INFRA_HOSTS + groups["infra"]
+    return groups
+
+
+def address(index):
+    """Unique 10.x.y.z address per index, skipping .0 and .255."""
+    return f"10.{index // (254 * 256) % 256}.{index // 254 % 256}.{index % 254 + 1}"
+
+
+def write_inventory(path, groups):
+    lines = []
+    index = 1
+    for group, hosts in groups.items():
+        lines.append(f"[{group}]")
+        for host in hosts:
+            lines.append(f"{host} ansible_host={address(index)}")
+            index += 1
+        lines.append("")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines))
+
+
+def encrypt(text):
+    from ansible.parsing.vault import VaultLib, VaultSecret
+
+    vault = VaultLib([("default", VaultSecret(VAULT_PASSWORD.encode()))])
+    return vault.encrypt(text).decode()
+
+
+def write_vault(path, names):
+    body = "---\n" + "".join(f"{name}: \"synthetic-{name}\"\n" for name in sorted(names))
+    path.write_text(encrypt(body))
+
+
+def copy_group_vars(tree):
+    """Copy group_vars, replacing each vault.yml with synthetic secrets under the bench password."""
+    shutil.copytree(ROOT / "group_vars", tree / "group_vars", ignore=shutil.ignore_patterns("vault.yml"))
+    for group_dir in (tree / "group_vars").iterdir():
+        if group_dir.is_dir():
+            names = set()
+            for vars_file in group_dir.glob("*.yml"):
+                names.update(VAULT_REF.findall(vars_file.read_text()))
+            if names:
+                write_vault(group_dir / "vault.yml", names)
+
+
+def write_host_vars(tree, groups, vault_every):
+    host_vars = tree / "host_vars"
+    shutil.copytree(ROOT / "host_vars", host_vars)
+    count = 0
+    for group, hosts in groups.items():
+        for host in hosts:
+            if (host_vars / f"{host}.yml").exists():
+                continue
+            count += 1
+            body = (
+                "---\n"
+                f"ufw_rules_host:\n  - {{ port: {8000 + count % 1000}, proto: tcp, comment: {group} }}\n"
+                f"host_role_note: \"{{{{ inventory_hostname }}}} in {group}\"\n"
+            )
+            if vault_every and count % vault_every == 0:
+                host_dir = host_vars / host
+                host_dir.mkdir()
+                (host_dir / "vars.yml").write_text(body + "host_secret: \"{{ vault_host_secret }}\"\n")
+                write_vault(host_dir / "vault.yml", ["vault_host_secret"])
+            else:
+                (host_vars / f"{host}.yml").write_text(body)
+
+
+def generate(tree, size, vault_every=50):
+    """Build a repo-shaped tree at ``tree`` with a ``size``-host inventory."""
+    groups = fleet(size)
+    shutil.copytree(ROOT / "ansible", tree / "ansible",
+                    ignore=shutil.ignore_patterns("molecule", "__pycache__"))
+    write_inventory(tree / "inventories/fleet.ini", groups)
+    copy_group_vars(tree)
+    write_host_vars(tree, groups, vault_every)
+    (tree / ".vault-pass").write_text(VAULT_PASSWORD + "\n")
+    (tree / "ansible.cfg").write_text(
+        "[defaults]\n"
+        "roles_path = ./ansible/roles\n"
+        "inventory = ./inventories/fleet.ini\n"
+        "vault_password_file = ./.vault-pass\n"
+        "host_key_checking = False\n"
+        "interpreter_python = auto_silent\n"
+        "retry_files_enabled = False\n"
+    )
+    return groups
+
+
+# -- measurement --------------------------------------------------------------
+
+def ansible_env(tree):
+    env = dict(os.environ, ANSIBLE_CONFIG=str(tree / "ansible.cfg"), ANSIBLE_NOCOLOR="1")
+    env.pop("ANSIBLE_VAULT_PASSWORD_FILE", None)
+    return env
+
+
+def timed(argv, tree, repeat):
+    samples = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        proc = subprocess.run(argv, cwd=tree, env=ansible_env(tree), stdin=subprocess.DEVNULL,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        samples.append(time.perf_counter() - began)
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines() or [""]
+            error = next((line for line in lines if line.startswith("[ERROR]")), lines[-1])
+            return {"seconds": round(samples[-1], 3), "rc": proc.returncode, "error": error}
+    return {"seconds": round(statistics.median(samples), 3), "rc": 0}
+
+
+def templating_cost(tree):
+    """Template every inventory variable of every host; runs inside ``tree``."""
+    from ansible import context
+    from ansible.inventory.manager import InventoryManager
+    from ansible.module_utils.common.collections import ImmutableDict
+    from ansible.parsing.dataloader import DataLoader
+    from ansible.parsing.vault import VaultSecret
+    from ansible.template import Templar
+    from ansible.vars.hostvars import HostVars
+    from ansible.vars.manager import VariableManager
+
+    context.CLIARGS = ImmutableDict()
+    began = time.perf_counter()
+    loader = DataLoader()
+    loader.set_basedir(str(tree))
+    loader.set_vault_secrets([("default", VaultSecret(VAULT_PASSWORD.encode()))])
+    inventory = InventoryManager(loader=loader, sources=[str(tree / "inventories/fleet.ini")])
+    variable_manager = VariableManager(loader=loader, inventory=inventory)
+    HostVars(inventory=inventory, variable_manager=variable_manager, loader=loader)
+    loaded = time.perf_counter()
+
+    hosts = inventory.get_hosts()
+    templated = 0
+    for host in hosts:
+        variables = variable_manager.get_vars(host=host)
+        templar = Templar(loader=loader, variables=variables)
+        for name, value in variables.items():
+            if name not in ("hostvars", "vars", "groups"):
+                templar.template(value)
+                templated += 1
+    done = time.perf_counter()
+    return {
+        "load_s": round(loaded - began, 3),
+        "total_s": round(done - loaded, 3),
+        "per_host_ms": round(1000 * (done - loaded) / max(1, len(hosts)), 3),
+        "variables": templated,
+    }
+
+
+def measure(tree, size, repeat):
+    result = {"hosts": size}
+    result["inventory_list"] = timed(["ansible-inventory", "--list", "--output", os.devnull], tree, repeat)
+    result["playbooks"] = {
+        playbook.name: timed(["ansible-playbook", "--list-hosts", "--list-tasks", str(playbook)], tree, repeat)
+        for playbook in sorted((tree / "ansible/playbooks").glob("*.yml"))
+    }
+    proc = subprocess.run([sys.executable, __file__, "--templating", str(tree)], cwd=tree, env=ansible_env(tree),
+                          stdin=subprocess.DEVNULL, check=True, stdout=subprocess.PIPE, text=True)
+    result["templating"] = json.loads(proc.stdout)
+    return result
+
+
+def environment():
+    try:
+        from ansible.release import __version__ as ansible_version
+    except ImportError:
+        ansible_version = None
+    return {
+        "ansible_core": ansible_version,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "recorded": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def run(sizes, repeat, vault_every, keep=None):
+    results = {"environment": environment(), "sizes": {}}
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix=f"fleet-{size}-") as tmp:
+            tree = Path(keep) / str(size) if keep else Path(tmp)
+            began = time.perf_counter()
+            generate(tree, size, vault_every)
+            print(f"generated {size} hosts in {time.perf_counter() - began:.1f}s", file=sys.stderr)
+            results["sizes"][str(size)] = measure(tree, size, repeat)
+    return results
+
+
+# -- baselines ----------------------------------------------------------------
+
+def metrics(size_result):
+    """Flat metric name -> seconds for one size; None for a playbook that failed to plan."""
+    flat = {"inventory_list": size_result["inventory_list"]["seconds"]}
+    for name, playbook in size_result["playbooks"].items():
+        flat[f"plan:{name}"] = playbook["seconds"] if playbook["rc"] == 0 else None
+    flat["templating"] = size_result["templating"]["total_s"]
+    return flat
+
+
+def missing_sizes(results, baseline):
+    return [size for size in results["sizes"] if size not in baseline.get("sizes", {})]
+
+
+def compare(results, baseline, tolerance):
+    """Rows of (size, metric, baseline, current, ratio, regressed) for sizes in both.
+
+    A playbook that planned in the baseline but fails now is a regression
+    with current and ratio None.
+    """
+    rows = []
+    for size, current in results["sizes"].items():
+        if size not in baseline.get("sizes", {}):
+            continue
+        before = metrics(baseline["sizes"][size])
+        for name, seconds in metrics(current).items():
+            if before.get(name) is None:
+                continue
+            if seconds is None:
+                rows.append((size, name, before[name], None, None, True))
+                continue
+            ratio = seconds / before[name] if before[name] else float("inf")
+            regressed = ratio > 1 + tolerance and seconds - before[name] > MIN_DELTA
+            rows.append((size, name, before[name], seconds, ratio, regressed))
+    return rows
+
+
+def print_results(results):
+    print(f"{'hosts':>6} {'metric':<28} {'seconds':>9}")
+    for size, result in results["sizes"].items():
+        for name, seconds in metrics(result).items():
+            if seconds is not None:
+                print(f"{size:>6} {name:<28} {seconds:>9.3f}")
+        for name, playbook in result["playbooks"].items():
+            if playbook["rc"] != 0:
+                print(f"{size:>6} {'plan:' + name:<28} {'failed':>9}  {playbook['error']}")
+        print(f"{size:>6} {'templating per host (ms)':<28} {result['templating']['per_host_ms']:>9.3f}")
+
+
+def print_comparison(rows, tolerance):
+    if not rows:
+        return
+    print(f"\n{'hosts':>6} {'metric':<28} {'baseline':>9} {'now':>9} {'ratio':>6}")
+    for size, name, before, now, ratio, regressed in rows:
+        if now is None:
+            print(f"{size:>6} {name:<28} {before:>9.3f} {'failed':>9} {'':>6}  REGRESSED (no longer plans)")
+            continue
+        flag = f"  REGRESSED (> +{tolerance:.0%})" if regressed else ""
+        print(f"{size:>6} {name:<28} {before:>9.3f} {now:>9.3f} {ratio:>6.2f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per command (median is reported)")
+    parser.add_argument("--vault-every", type=int, default=50,
+                        help="every Nth generated host gets a vault-encrypted host_vars file (0 = none)")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before --check fails")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any metric regressed against the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="merge these results into the baseline")
+    parser.add_argument("--output", help="also write results as JSON to this path")
+    parser.add_argument("--keep", help="generate trees under this directory and leave them for inspection")
+    parser.add_argument("--templating", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.templating:
+        json.dump(templating_cost(Path(args.templating)), sys.stdout)
+        return
+
+    results = run(args.sizes, args.repeat, args.vault_every, args.keep)
+    print_results(results)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {"sizes": {}}
+    rows = compare(results, baseline, args.tolerance)
+    print_comparison(rows, args.tolerance)
+    missing = missing_sizes(results, baseline)
+    if missing and not args.update_baseline:
+        print(f"\nno baseline for {', '.join(missing)} hosts in {baseline_path}; "
+              "record one with make bench-fleet-baseline", file=sys.stderr)
+
+    if args.update_baseline:
+        baseline["environment"] = results["environment"]
+        baseline.setdefault("sizes", {}).update(results["sizes"])
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+    if args.check and (any(row[-1] for row in rows) or (missing and not args.update_baseline)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Compare packet matching cost of nftables ban sets against per-address rules.
+
+fail2ban's nftables actions put every banned address into one set and match
+it with a single "ip saddr @set" rule; the iptables actions add one rule per
+address, which every packet walks in order. This builds both layouts inside
+a throwaway network namespace with N banned addresses, runs a UDP echo
+server behind them and times request/response round trips from an address
+that is not banned (the worst case for a rule chain: every rule is checked).
+
+Needs root and the nft binary. Only the "f2bbench" namespace and its veth
+pair are touched; both are removed on exit.
+
+    sudo python benchmarks/nft_ban_lookup.py --sizes 0 1000 10000 50000
+"""
+
+import argparse
+import ipaddress
+import json
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+NETNS = "f2bbench"
+HOST_IF, NS_IF = "f2b0", "f2b1"
+HOST_ADDR, NS_ADDR = "10.253.0.1", "10.253.0.2"
+PORT = 9999
+MODES = ("set", "rules")
+
+
+def banned_addresses(count, seed=0):
+    """Distinct addresses from 172.16.0.0/12, never the benchmark client."""
+    rng = random.Random(seed)
+    network = ipaddress.ip_network("172.16.0.0/12")
+    picked = rng.sample(range(1, network.num_addresses - 1), count)
+    return [str(network[offset]) for offset in picked]
+
+
+def ruleset(mode, addresses):
+    """nft script laid out the way fail2ban (set) or per-IP actions (rules) would."""
+    lines = [
+        "table inet f2b-bench {",
+        "  set addr-set-bench { type ipv4_addr; }",
+        "  chain f2b-chain { type filter hook input priority -1; }",
+        "}",
+    ]
+    if mode == "set":
+        lines.append(f"add rule inet f2b-bench f2b-chain udp dport {PORT} ip saddr @addr-set-bench drop")
+        for start in range(0, len(addresses), 5000):
+            chunk = ", ".join(addresses[start:start + 5000])
+            lines.append(f"add element inet f2b-bench addr-set-bench {{ {chunk} }}")
+    elif mode == "rules":
+        lines.extend(
+            f"add rule inet f2b-bench f2b-chain udp dport {PORT} ip saddr {address} drop"
+            for address in addresses
+        )
+    else:
+        raise ValueError(f"unknown mode {mode}")
+    return "\n".join(lines) + "\n"
+
+
+def run(*argv, check=True):
+    return subprocess.run(argv, check=check, capture_output=True, text=True)
+
+
+def in_ns(*argv, check=True):
+    return run("ip", "netns", "exec", NETNS, *argv, check=check)
+
+
+def setup_namespace():
+    teardown_namespace()
+    run("ip", "netns", "add", NETNS)
+    run("ip", "link", "add", HOST_IF, "type", "veth", "peer", "name", NS_IF, "netns", NETNS)
+    run("ip", "addr", "add", f"{HOST_ADDR}/30", "dev", HOST_IF)
+    run("ip", "link", "set", HOST_IF, "up")
+    in_ns("ip", "addr", "add", f"{NS_ADDR}/30", "dev", NS_IF)
+    in_ns("ip", "link", "set", NS_IF, "up")
+    in_ns("ip", "link", "set", "lo", "up")
+
+
+def teardown_namespace():
+    run("ip", "link", "del", HOST_IF, check=False)
+    run("ip", "netns", "del", NETNS, check=False)
+
+
+def load_ruleset(script, workdir):
+    in_ns("nft", "flush", "ruleset")
+    path = workdir / "ruleset.nft"
+    path.write_text(script)
+    in_ns("nft", "-f", str(path))
+
+
+def serve(address, port):
+    """UDP echo server; run inside the namespace by the parent process."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind((address, port))
+        while True:
+            data, peer = sock.recvfrom(64)
+            sock.sendto(data, peer)
+
+
+def round_trips_per_sec(duration, timeout=1.0):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect((NS_ADDR, PORT))
+        # Warm up the path (ARP, conntrack) before timing
+        for _ in range(100):
+            sock.send(b"x")
+            sock.recv(64)
+        count = 0
+        began = time.perf_counter()
+        deadline = began + duration
+        while time.perf_counter() < deadline:
+            sock.send(b"x")
+            sock.recv(64)
+            count += 1
+        return count / (time.perf_counter() - began)
+
+
+def benchmark(sizes, modes, duration, repeat):
+    results = {"duration": duration, "repeat": repeat, "runs": []}
+    setup_namespace()
+    server = subprocess.Popen(
+        ["ip", "netns", "exec", NETNS, sys.executable, __file__, "--serve"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        with tempfile.TemporaryDirectory(prefix="nft-bench-") as tmp:
+            time.sleep(0.5)
+            for mode in modes:
+                for size in sizes:
+                    load_ruleset(ruleset(mode, banned_addresses(size)), Path(tmp))
+                    samples = sorted(round_trips_per_sec(duration) for _ in range(repeat))
+                    results["runs"].append({
+                        "mode": mode,
+                        "banned": size,
+                        "round_trips_per_sec": round(samples[len(samples) // 2], 1),
+                    })
+    finally:
+        server.kill()
+        server.wait()
+        teardown_namespace()
+
+    for mode in modes:
+        runs = [r for r in results["runs"] if r["mode"] == mode]
+        base = runs[0]["round_trips_per_sec"]
+        for r in runs:
+            r["relative"] = round(r["round_trips_per_sec"] / base, 3)
+    return results
+
+
+def print_table(results):
+    print(f"{'mode':<6} {'banned':>8} {'rtt/s':>10} {'vs first':>9}")
+    for r in results["runs"]:
+        print(f"{r['mode']:<6} {r['banned']:>8} {r['round_trips_per_sec']:>10.1f} {r['relative']:>8.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 10000, 50000],
+                        help="banned address counts to test (first is the reference)")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--duration", type=float, default=2.0, help="seconds per sample")
+    parser.add_argument("--repeat", type=int, default=3, help="samples per size (median is reported)")
+    parser.add_argument("--output", help="also write results as JSON to this path")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(NS_ADDR, PORT)
+        return
+    if not shutil.which("nft"):
+        sys.exit("nft is required to run the benchmark")
+
+    results = benchmark(args.sizes, args.modes, args.duration, args.repeat)
+    print_table(results)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""Shared helpers for the test modules (on sys.path via pytest's ``pythonpath``)."""
+
+import importlib.util
+
+
+def load_module(name, path):
+    """Import a standalone script (benchmark, tool, plugin) that is not on sys.path."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,167 @@
+"""pytest plugin: one-round-trip host snapshots for Molecule testinfra suites.
+
+Every ``host.package()``/``host.file()``/``host.service()`` call is its own
+Ansible command against the instance, so verify time grows with the number
+of assertions. The ``snapshot`` fixture instead ships snapshot_collector.py
+to each host once per test module, in a single ``host.run``, and tests read
+the result from memory.
+
+Loaded through ``PYTEST_PLUGINS=host_snapshot`` in each scenario's
+``verifier.env`` (with this directory on ``PYTHONPATH``). A test module
+declares what to collect beyond packages, users and listening ports::
+
+    SNAPSHOT = {
+        "services": ["fail2ban"],
+        "files": ["/etc/passwd"],             # stat + sha256
+        "contents": ["/etc/fail2ban/jail.local"],   # stat + text
+        "commands": ["ufw status"],
+    }
+
+Lookups of anything not declared raise KeyError naming the SNAPSHOT key to
+add. ``contains`` and ``missing`` match literal text (not grep regexes), and
+``missing_packages``/``missing`` return lists so a failing
+``assert ... == []`` shows exactly which items are absent.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+COLLECTOR = Path(__file__).with_name("snapshot_collector.py")
+
+
+class SnapshotError(KeyError):
+    pass
+
+
+class Package:
+    def __init__(self, name, version):
+        self.name = name
+        self.version = version
+        self.is_installed = version is not None
+
+    def __repr__(self):
+        return f"<package {self.name} {self.version or 'not installed'}>"
+
+
+class Service:
+    def __init__(self, name, state):
+        self.name = name
+        self.state = state
+        self.is_enabled = state["enabled"]
+        self.is_running = state["running"]
+
+    def __repr__(self):
+        return f"<service {self.name} {self.state}>"
+
+
+class User:
+    def __init__(self, name, account):
+        self.name = name
+        self.exists = account is not None
+        account = account or {}
+        self.uid = account.get("uid")
+        self.home = account.get("home")
+        self.shell = account.get("shell")
+        self.groups = account.get("groups", [])
+
+    def __repr__(self):
+        return f"<user {self.name} shell={self.shell} groups={self.groups}>"
+
+
+class File:
+    def __init__(self, path, info, content):
+        self.path = path
+        self.info = info
+        self._content = content
+        self.exists = info["exists"]
+        self.is_symlink = info["is_symlink"]
+        self.is_file = info.get("type") == "file"
+        self.is_directory = info.get("type") == "directory"
+        self.mode = info.get("mode")
+        self.user = info.get("user")
+        self.group = info.get("group")
+        self.size = info.get("size")
+        self.sha256 = info.get("sha256")
+        self.linked_to = info.get("linked_to")
+
+    @property
+    def content_string(self):
+        if self._content is None and self.exists:
+            raise SnapshotError(f"{self.path}: content not collected; add it to SNAPSHOT['contents']")
+        return self._content or ""
+
+    def contains(self, text):
+        return text in self.content_string
+
+    def missing(self, *texts):
+        """The given snippets that do not appear in the file, in order."""
+        content = self.content_string
+        return [text for text in texts if text not in content]
+
+    def listdir(self):
+        return self.info.get("entries", [])
+
+    def __repr__(self):
+        if not self.exists:
+            return f"<file {self.path} (absent)>"
+        return f"<file {self.path} {self.info['type']} mode={oct(self.mode)} {self.user}:{self.group}>"
+
+
+class Command:
+    def __init__(self, command, result):
+        self.command = command
+        self.rc = result["rc"]
+        self.stdout = result["stdout"]
+        self.stderr = result["stderr"]
+
+    def __repr__(self):
+        return f"<command {self.command!r} rc={self.rc}>"
+
+
+class Snapshot:
+    def __init__(self, data):
+        self.data = data
+
+    def _declared(self, section, key, spec_key):
+        try:
+            return self.data[section][key]
+        except KeyError:
+            raise SnapshotError(f"{key!r} was not collected; add it to SNAPSHOT[{spec_key!r}]") from None
+
+    def package(self, name):
+        return Package(name, self.data["packages"].get(name))
+
+    def missing_packages(self, *names):
+        return [name for name in names if name not in self.data["packages"]]
+
+    def service(self, name):
+        unit = name if "." in name else name + ".service"
+        return Service(name, self._declared("services", unit, "services"))
+
+    def file(self, path):
+        info = self._declared("files", path, "files")
+        return File(path, info, self.data["contents"].get(path))
+
+    def user(self, name):
+        return User(name, self.data["users"].get(name))
+
+    def listening(self, port):
+        return port in self.data["listening"]
+
+    def command(self, command):
+        return Command(command, self._declared("commands", command, "commands"))
+
+
+def collect(host, spec):
+    """Run the collector on ``host`` in one command and wrap the result."""
+    result = host.run("python3 -c %s %s", COLLECTOR.read_text(), json.dumps(spec))
+    if result.rc != 0:
+        raise RuntimeError(f"snapshot collection failed (rc={result.rc}): {result.stderr.strip()}")
+    return Snapshot(json.loads(result.stdout))
+
+
+@pytest.fixture(scope="module")
+def snapshot(host, request):
+    return collect(host, getattr(request.module, "SNAPSHOT", {}))
@@ -0,0 +1,167 @@
+"""Collect a verification snapshot of the host this runs on.
+
+Shipped to Molecule instances by host_snapshot.py and run there with the
+system python3, so it must stay stdlib-only and Python 3.6 compatible.
+Reads a JSON spec from argv[1] and prints one JSON document:
+
+    packages   installed dpkg packages -> version (always collected)
+    users      local accounts with shell, home and group names (always)
+    listening  TCP ports with a listening socket (always)
+    services   spec["services"] -> enabled/active state from one systemctl call
+    files      spec["files"] + spec["contents"] -> stat, sha256, dir entries
+    contents   spec["contents"] -> text (first MAX_CONTENT bytes)
+    commands   spec["commands"] -> rc/stdout/stderr of each shell command
+"""
+
+import grp
+import hashlib
+import json
+import os
+import pwd
+import stat
+import subprocess
+import sys
+
+MAX_CONTENT = 1024 * 1024
+# systemctl is-enabled exits 0 for these
+ENABLED_STATES = {"enabled", "enabled-runtime", "static", "indirect", "generated", "transient", "alias"}
+
+
+def run(argv, shell=False):
+    try:
+        proc = subprocess.run(argv, shell=shell, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              universal_newlines=True)
+    except OSError as exc:
+        return 127, "", str(exc)
+    return proc.returncode, proc.stdout, proc.stderr
+
+
+def unit_name(name):
+    return name if "." in name else name + ".service"
+
+
+def packages():
+    rc, out, _ = run(["dpkg-query", "-W", "-f=${Package}\t${db:Status-Status}\t${Version}\n"])
+    installed = {}
+    for line in out.splitlines():
+        fields = line.split("\t")
+        if len(fields) == 3 and fields[1] == "installed":
+            installed[fields[0]] = fields[2]
+    return installed
+
+
+def users():
+    members = {}
+    for group in grp.getgrall():
+        for member in group.gr_mem:
+            members.setdefault(member, []).append(group.gr_name)
+    accounts = {}
+    for entry in pwd.getpwall():
+        try:
+            primary = grp.getgrgid(entry.pw_gid).gr_name
+        except KeyError:
+            primary = str(entry.pw_gid)
+        accounts[entry.pw_name] = {
+            "uid": entry.pw_uid,
+            "home": entry.pw_dir,
+            "shell": entry.pw_shell,
+            "groups": sorted(set([primary] + members.get(entry.pw_name, []))),
+        }
+    return accounts
+
+
+def listening():
+    ports = set()
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                next(f)
+                for line in f:
+                    fields = line.split()
+                    if fields[3] == "0A":
+                        ports.add(int(fields[1].rsplit(":", 1)[1], 16))
+        except (OSError, StopIteration):
+            continue
+    return sorted(ports)
+
+
+def services(names):
+    if not names:
+        return {}
+    units = [unit_name(name) for name in names]
+    rc, out, _ = run(["systemctl", "show", "--no-pager", "-p", "Id,ActiveState,UnitFileState"] + units)
+    states = {}
+    # One block per requested unit, in order, separated by blank lines
+    for unit, block in zip(units, out.strip().split("\n\n")):
+        props = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+        states[unit] = {
+            "enabled": props.get("UnitFileState", "") in ENABLED_STATES,
+            "running": props.get("ActiveState") == "active",
+        }
+    return states
+
+
+def owner(uid, lookup, attr):
+    try:
+        return getattr(lookup(uid), attr)
+    except KeyError:
+        return str(uid)
+
+
+def file_info(path):
+    info = {"exists": False, "is_symlink": os.path.islink(path)}
+    try:
+        st = os.stat(path)
+    except OSError:
+        return info
+    info.update({
+        "exists": True,
+        "type": "directory" if stat.S_ISDIR(st.st_mode) else "file" if stat.S_ISREG(st.st_mode) else "other",
+        "mode": stat.S_IMODE(st.st_mode),
+        "user": owner(st.st_uid, pwd.getpwuid, "pw_name"),
+        "group": owner(st.st_gid, grp.getgrgid, "gr_name"),
+        "size": st.st_size,
+        "linked_to": os.path.realpath(path),
+    })
+    try:
+        if info["type"] == "file":
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(65536), b""):
+                    digest.update(chunk)
+            info["sha256"] = digest.hexdigest()
+        elif info["type"] == "directory":
+            info["entries"] = sorted(os.listdir(path))
+    except OSError as exc:
+        info["error"] = str(exc)
+    return info
+
+
+def content(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(MAX_CONTENT).decode("utf-8", "replace")
+    except OSError:
+        return None
+
+
+def collect(spec):
+    contents = spec.get("contents", [])
+    files = list(dict.fromkeys(spec.get("files", []) + contents))
+    commands = {}
+    for command in spec.get("commands", []):
+        rc, out, err = run(command, shell=True)
+        commands[command] = {"rc": rc, "stdout": out, "stderr": err}
+    return {
+        "packages": packages(),
+        "users": users(),
+        "listening": listening(),
+        "services": services(spec.get("services", [])),
+        "files": {path: file_info(path) for path in files},
+        "contents": {path: content(path) for path in contents},
+        "commands": commands,
+    }
+
+
+if __name__ == "__main__":
+    json.dump(collect(json.loads(sys.argv[1] if len(sys.argv) > 1 else "{}")), sys.stdout)
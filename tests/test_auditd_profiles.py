@@ -0,0 +1,70 @@
+import yaml
+import pytest
+from pathlib import Path
+
+from helpers import load_module
+
+pytest.importorskip("jinja2")
+
+ROOT = Path(__file__).parent.parent
+BENCH_PATH = ROOT / "benchmarks/auditd_execve.py"
+
+
+bench = load_module("auditd_execve", BENCH_PATH)
+
+
+@pytest.fixture
+def profiles():
+    with open(ROOT / "group_vars/all.yml") as f:
+        return yaml.safe_load(f)["auditd_profiles"]
+
+
+@pytest.fixture
+def rendered(tmp_path):
+    bench.render_profiles(tmp_path)
+    return {path.stem: path.read_text().splitlines() for path in tmp_path.glob("*.rules")}
+
+
+def test_profiles_define_tunables(profiles):
+    for name, profile in profiles.items():
+        for key in ["exec_rule", "exec_exclude_users", "backlog_limit", "backlog_wait_time", "rate_limit", "conf"]:
+            assert key in profile, f"auditd profile {name} missing {key}"
+        assert profile["exec_rule"] in ["all", "interactive", "none"]
+        assert "flush" in profile["conf"] and "freq" in profile["conf"]
+
+
+def test_group_profiles_exist(profiles):
+    for vars_file in [ROOT / "group_vars/all.yml", ROOT / "group_vars/runners/vars.yml"]:
+        with open(vars_file) as f:
+            selected = yaml.safe_load(f).get("auditd_profile")
+        if selected:
+            assert selected in profiles, f"{vars_file} selects unknown auditd profile {selected}"
+
+
+def test_rules_set_backlog_and_rate(profiles, rendered):
+    for name, lines in rendered.items():
+        assert f"-b {profiles[name]['backlog_limit']}" in lines
+        assert f"--backlog_wait_time {profiles[name]['backlog_wait_time']}" in lines
+        assert f"-r {profiles[name]['rate_limit']}" in lines
+
+
+def test_exclusions_precede_exec_rule(rendered):
+    for name, lines in rendered.items():
+        never = [i for i, line in enumerate(lines) if line.startswith("-a never,exit")]
+        always = [i for i, line in enumerate(lines) if line.startswith("-a always,exit") and "execve" in line]
+        if never:
+            assert max(never) < min(always), f"{name}: exclusion after the execve rule never matches"
+
+
+def test_ci_runner_audits_only_login_sessions(rendered):
+    exec_rules = [line for line in rendered["ci_runner"] if line.startswith("-a always,exit")]
+    assert exec_rules == ["-a always,exit -F arch=b64 -S execve -F auid>=1000 -F auid!=unset -k exec"]
+
+
+def test_auditd_conf_changes_reload_without_systemctl_restart():
+    with open(ROOT / "ansible/playbooks/hardening.yml") as f:
+        play = yaml.safe_load(f)[0]
+    handlers = {handler["name"]: handler for handler in play["handlers"]}
+    tune = next(task for task in play["tasks"] if task["name"] == "Tune auditd.conf")
+    handler = handlers[tune["notify"]]
+    assert "auditctl --signal reload" in handler["ansible.builtin.command"]
@@ -0,0 +1,52 @@
+import shutil
+from pathlib import Path
+
+import pytest
+import yaml
+
+from helpers import load_module
+
+ROOT = Path(__file__).parent.parent
+BENCH_PATH = ROOT / "benchmarks/callback_overhead.py"
+
+
+bench = load_module("callback_overhead", BENCH_PATH)
+
+
+def test_generated_project(tmp_path):
+    bench.write_project(tmp_path, hosts=12, tasks=3)
+    inventory = (tmp_path / "hosts.ini").read_text()
+    assert inventory.count("bench-") == 12
+    assert "ansible_connection=local" in inventory
+    play = yaml.safe_load((tmp_path / "play.yml").read_text())
+    assert len(play[0]["tasks"]) == 3
+    config = (tmp_path / "ansible.cfg").read_text()
+    assert "callbacks_enabled" not in config
+    assert str(bench.CALLBACK_DIR) in config
+
+
+def test_callback_only_enabled_outside_off_mode(tmp_path):
+    assert "ANSIBLE_CALLBACKS_ENABLED" not in bench.ansible_env(tmp_path, "off", "")
+    env = bench.ansible_env(tmp_path, "on", "http://127.0.0.1:1")
+    assert env["ANSIBLE_CALLBACKS_ENABLED"] == "elastic_bulk"
+    assert env["ELASTIC_BULK_URL"] == "http://127.0.0.1:1"
+
+
+def test_over_budget():
+    results = {"runs": [
+        {"forks": 50, "mode": "off", "overhead_pct": 0.0},
+        {"forks": 50, "mode": "on", "overhead_pct": 4.2},
+        {"forks": 50, "mode": "down", "overhead_pct": 12.5},
+    ]}
+    assert [r["mode"] for r in bench.over_budget(results, 10.0)] == ["down"]
+
+
+@pytest.mark.skipif(not shutil.which("ansible-playbook"), reason="needs ansible-playbook")
+def test_small_run_ships_every_event():
+    results = bench.benchmark(hosts=4, tasks=2, forks_list=[4], repeat=1)
+    runs = {r["mode"]: r for r in results["runs"]}
+    assert runs["off"]["overhead_pct"] == 0.0
+    assert runs["off"]["events_shipped"] == 0
+    # playbook_start, play_start, 4 hosts x 2 tasks, and one summary per host
+    assert runs["on"]["events_shipped"] >= 4 * 2
+    assert runs["down"]["events_shipped"] == 0
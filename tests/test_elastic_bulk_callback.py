@@ -0,0 +1,238 @@
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from helpers import load_module
+
+pytest.importorskip("ansible")
+
+PLUGIN_PATH = Path(__file__).parent.parent / "ansible/plugins/callback/elastic_bulk.py"
+
+
+elastic_bulk = load_module("elastic_bulk", PLUGIN_PATH)
+
+
+class StandInElastic(ThreadingHTTPServer):
+    """Minimal _bulk endpoint that records every document it receives."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), BulkHandler)
+        self.requests = []
+        self.status = 200
+        self.fail_after = None
+        self.throttled = set()
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    @property
+    def docs(self):
+        return [doc for body in self.requests for doc in body]
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class BulkHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        lines = [json.loads(line) for line in body.splitlines() if line]
+        failing = self.server.fail_after is not None and len(self.server.requests) >= self.server.fail_after
+        if self.server.status != 200 or failing:
+            self.send_response(self.server.status if self.server.status != 200 else 503)
+            self.end_headers()
+            return
+        assert self.path == "/_bulk"
+        assert self.headers["Content-Type"] == "application/x-ndjson"
+        assert all("index" in action for action in lines[0::2])
+        docs = lines[1::2]
+        # Documents whose seq is in ``throttled`` are rejected with a 429
+        statuses = [429 if doc.get("seq") in self.server.throttled else 201 for doc in docs]
+        self.server.requests.append([doc for doc, status in zip(docs, statuses) if status == 201])
+        reply = {"errors": 429 in statuses, "items": [{"index": {"status": status}} for status in statuses]}
+        payload = json.dumps(reply).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = StandInElastic()
+    yield srv
+    srv.stop()
+
+
+@pytest.fixture
+def dead_url():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def hanging_url():
+    """Accepts connections (via the listen backlog) but never answers."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(16)
+        yield f"http://127.0.0.1:{sock.getsockname()[1]}"
+
+
+def write_spool(tmp_path, seqs):
+    spool = tmp_path / "spool.ndjson"
+    spool.write_text("".join(json.dumps({"seq": i}) + "\n" for i in seqs))
+    return spool
+
+
+def make_shipper(url, tmp_path, **kwargs):
+    options = {"batch_size": 10, "flush_interval": 60.0, "timeout": 1.0}
+    options.update(kwargs)
+    return elastic_bulk.BulkShipper(url, "ansible-runs", spool_path=str(tmp_path / "spool.ndjson"), **options)
+
+
+def test_batches_by_size(server, tmp_path):
+    shipper = make_shipper(server.url, tmp_path, batch_size=10)
+    for i in range(25):
+        shipper.submit({"seq": i})
+    shipper.close()
+
+    assert [len(body) for body in server.requests] == [10, 10, 5]
+    assert [doc["seq"] for doc in server.docs] == list(range(25))
+    assert shipper.sent == 25
+    assert not (tmp_path / "spool.ndjson").exists()
+
+
+def test_flushes_on_interval(server, tmp_path):
+    shipper = make_shipper(server.url, tmp_path, batch_size=1000, flush_interval=0.1)
+    shipper.submit({"seq": 0})
+    for _ in range(50):
+        if server.requests:
+            break
+        threading.Event().wait(0.05)
+    assert server.docs == [{"seq": 0}]
+    shipper.close()
+
+
+def test_spools_when_endpoint_down_and_replays(server, dead_url, tmp_path):
+    shipper = make_shipper(dead_url, tmp_path, timeout=0.5)
+    for i in range(5):
+        shipper.submit({"seq": i})
+    shipper.close()
+
+    spool = tmp_path / "spool.ndjson"
+    assert [json.loads(line)["seq"] for line in spool.read_text().splitlines()] == list(range(5))
+
+    replayer = make_shipper(server.url, tmp_path)
+    replayer.submit({"seq": 5})
+    replayer.close()
+
+    assert sorted(doc["seq"] for doc in server.docs) == list(range(6))
+    assert not spool.exists()
+
+
+def test_spools_on_server_error(server, tmp_path):
+    server.status = 503
+    shipper = make_shipper(server.url, tmp_path)
+    shipper.submit({"seq": 0})
+    shipper.close()
+
+    assert shipper.sent == 0
+    assert shipper.spooled == 1
+
+
+def test_spool_is_bounded(dead_url, tmp_path):
+    shipper = make_shipper(dead_url, tmp_path, batch_size=50, timeout=0.5, spool_max_bytes=4096)
+    for i in range(500):
+        shipper.submit({"seq": i, "pad": "x" * 40})
+    shipper.close(timeout=30)
+
+    spool = tmp_path / "spool.ndjson"
+    lines = spool.read_text().splitlines()
+    assert spool.stat().st_size <= 4096
+    assert json.loads(lines[-1])["seq"] == 499
+    assert all(json.loads(line) for line in lines)
+
+
+def test_submit_never_blocks_when_queue_full(dead_url, tmp_path):
+    shipper = make_shipper(dead_url, tmp_path, queue_size=1, timeout=0.5)
+    for i in range(100):
+        shipper.submit({"seq": i})
+    shipper.close()
+    assert shipper.dropped > 0
+
+
+def test_local_log_receives_every_event(dead_url, tmp_path):
+    local_log = tmp_path / "runs/bootstrap.ndjson"
+    shipper = make_shipper(dead_url, tmp_path, timeout=0.5, local_log=str(local_log))
+    for i in range(5):
+        shipper.submit({"seq": i})
+    shipper.close()
+
+    assert [json.loads(line)["seq"] for line in local_log.read_text().splitlines()] == list(range(5))
+
+
+def test_close_timeout_spools_the_batch_in_flight(hanging_url, tmp_path):
+    shipper = make_shipper(hanging_url, tmp_path, timeout=30.0)
+    for i in range(30):
+        shipper.submit({"seq": i})
+    started = time.monotonic()
+    shipper.close(timeout=1)
+
+    assert time.monotonic() - started < 1 + shipper.SHUTDOWN_GRACE
+    spool = tmp_path / "spool.ndjson"
+    assert sorted(json.loads(line)["seq"] for line in spool.read_text().splitlines()) == list(range(30))
+    assert (shipper.spooled, shipper.dropped, shipper.sent) == (30, 0, 0)
+
+
+def test_spool_survives_an_interrupted_replay(hanging_url, tmp_path):
+    spool = write_spool(tmp_path, range(5))
+    shipper = make_shipper(hanging_url, tmp_path, timeout=30.0)
+    time.sleep(0.3)  # worker is now blocked replaying; a dying run would exit here
+    assert [json.loads(line)["seq"] for line in spool.read_text().splitlines()] == list(range(5))
+    shipper.close(timeout=0.5)
+
+    assert [json.loads(line)["seq"] for line in spool.read_text().splitlines()] == list(range(5))
+
+
+def test_replay_resumes_after_the_last_acknowledged_chunk(server, tmp_path):
+    spool = write_spool(tmp_path, range(25))
+    server.fail_after = 1
+    make_shipper(server.url, tmp_path).close()
+    assert [doc["seq"] for doc in server.docs] == list(range(10))
+    assert spool.exists()
+
+    server.fail_after = None
+    make_shipper(server.url, tmp_path).close()
+    assert [doc["seq"] for doc in server.docs] == list(range(25))
+    assert not spool.exists()
+    assert not (tmp_path / "spool.ndjson.offset").exists()
+
+
+def test_replay_keeps_throttled_docs_when_a_later_chunk_fails(server, tmp_path):
+    write_spool(tmp_path, range(25))
+    server.throttled = {0, 1, 2}
+    server.fail_after = 1
+    make_shipper(server.url, tmp_path).close()
+    assert [doc["seq"] for doc in server.docs] == list(range(3, 10))
+
+    server.throttled = set()
+    server.fail_after = None
+    make_shipper(server.url, tmp_path).close()
+    assert sorted(doc["seq"] for doc in server.docs) == list(range(25))
+    assert not (tmp_path / "spool.ndjson").exists()
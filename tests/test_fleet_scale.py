@@ -0,0 +1,105 @@
+import json
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+from helpers import load_module
+
+pytest.importorskip("ansible")
+
+ROOT = Path(__file__).parent.parent
+BENCH_PATH = ROOT / "benchmarks/fleet_scale.py"
+
+
+bench = load_module("fleet_scale", BENCH_PATH)
+
+
+@pytest.mark.parametrize("size", [4, 100, 1234, 20000])
+def test_fleet_size_and_named_infra_hosts(size):
+    groups = bench.fleet(size)
+    hosts = [host for members in groups.values() for host in members]
+    assert len(hosts) == size
+    assert len(set(hosts)) == size
+    assert groups["infra"][:4] == bench.INFRA_HOSTS
+
+
+def test_addresses_unique_at_max_size():
+    assert len({bench.address(i) for i in range(1, 20001)}) == 20000
+
+
+@pytest.fixture(scope="module")
+def tree(tmp_path_factory):
+    tree = tmp_path_factory.mktemp("fleet")
+    bench.generate(tree, 60, vault_every=10)
+    return tree
+
+
+def test_generated_layout(tree):
+    inventory = (tree / "inventories/fleet.ini").read_text()
+    assert len(re.findall(r"ansible_host=", inventory)) == 60
+    assert "[runners]" in inventory
+    assert (tree / "ansible/playbooks/hardening.yml").exists()
+    assert not list(tree.glob("ansible/roles/*/molecule"))
+    assert "elastic_bulk" not in (tree / "ansible.cfg").read_text()
+    assert (tree / "host_vars/gitlab.yml").read_text() == (ROOT / "host_vars/gitlab.yml").read_text()
+
+
+def test_vault_files_cover_references(tree):
+    from ansible.parsing.vault import VaultLib, VaultSecret
+
+    vault = VaultLib([("default", VaultSecret(bench.VAULT_PASSWORD.encode()))])
+    for group in ["infra", "runners"]:
+        encrypted = (tree / f"group_vars/{group}/vault.yml").read_text()
+        assert encrypted.startswith("$ANSIBLE_VAULT;")
+        plain = vault.decrypt(encrypted).decode()
+        referenced = bench.VAULT_REF.findall((ROOT / f"group_vars/{group}/vars.yml").read_text())
+        assert all(f"{name}:" in plain for name in referenced)
+    host_vaults = list(tree.glob("host_vars/*/vault.yml"))
+    assert len(host_vaults) == 5
+
+
+def test_templating_resolves_every_host(tree):
+    result = bench.templating_cost(tree)
+    assert result["variables"] > 60 * 10
+    assert result["per_host_ms"] > 0
+
+
+def baseline_for(inventory=1.0, plan=1.0, templating=1.0):
+    return {"sizes": {"100": {
+        "inventory_list": {"seconds": inventory, "rc": 0},
+        "playbooks": {"site.yml": {"seconds": plan, "rc": 0}, "broken.yml": {"seconds": 0.1, "rc": 1, "error": "x"}},
+        "templating": {"total_s": templating, "per_host_ms": templating * 10},
+    }}}
+
+
+def test_compare_flags_real_regressions_only():
+    before = baseline_for(inventory=2.0, plan=0.1, templating=4.0)
+    after = baseline_for(inventory=3.0, plan=0.2, templating=4.2)
+    rows = {name: regressed for _, name, _, _, _, regressed in bench.compare(after, before, 0.25)}
+    assert rows == {"inventory_list": True, "plan:site.yml": False, "templating": False}
+
+
+def test_compare_skips_sizes_without_baseline():
+    assert bench.compare(baseline_for(), {"sizes": {}}, 0.25) == []
+
+
+def test_compare_flags_playbooks_that_stop_planning():
+    after = baseline_for()
+    after["sizes"]["100"]["playbooks"]["site.yml"] = {"seconds": 0.1, "rc": 4, "error": "[ERROR]: boom"}
+    rows = [row for row in bench.compare(after, baseline_for(), 0.25) if row[1] == "plan:site.yml"]
+    assert rows == [("100", "plan:site.yml", 1.0, None, None, True)]
+
+
+def test_check_fails_without_baseline(tmp_path, monkeypatch):
+    monkeypatch.setattr(bench, "run", lambda *args: baseline_for())
+    argv = ["fleet_scale.py", "--sizes", "100", "--check", "--baseline", str(tmp_path / "missing.json")]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit) as exited:
+        bench.main()
+    assert exited.value.code == 1
+
+    (tmp_path / "missing.json").write_text(json.dumps(baseline_for()))
+    monkeypatch.setattr(sys, "argv", argv[:-1] + [str(tmp_path / "missing.json")])
+    bench.main()
@@ -0,0 +1,61 @@
+import json
+import yaml
+import pytest
+from pathlib import Path
+
+jinja2 = pytest.importorskip("jinja2")
+tomllib = pytest.importorskip("tomllib")
+
+ROLE_DIR = Path(__file__).parent.parent / "ansible/roles/gitlab_runner"
+
+
+@pytest.fixture
+def role_defaults():
+    with open(ROLE_DIR / "defaults/main.yml") as f:
+        return yaml.safe_load(f)
+
+
+def render_config(defaults, **overrides):
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(str(ROLE_DIR / "templates")))
+    env.filters["to_json"] = json.dumps
+    context = dict(defaults, runner_concurrent=4, runner_token="glrt-test",
+                   runner_hostname={"stdout": "runner-1"})
+    context.update(overrides)
+    return tomllib.loads(env.get_template("config.toml.j2").render(**context))
+
+
+def test_runner_config_is_valid_toml(role_defaults):
+    config = render_config(role_defaults)
+    assert config["concurrent"] == 4
+    runner = config["runners"][0]
+    assert runner["limit"] == 4
+    assert runner["token"] == "glrt-test"
+    assert runner["name"] == "runner-1-runner"
+
+
+def test_runner_docker_limits(role_defaults):
+    docker = render_config(role_defaults)["runners"][0]["docker"]
+    assert docker["pull_policy"] == ["if-not-present"]
+    assert docker["cpus"] == str(role_defaults["gitlab_runner_job_cpus"])
+    assert docker["memory"] == f"{role_defaults['gitlab_runner_job_memory_mb']}m"
+    assert docker["memory_swap"] == docker["memory"]
+
+
+def test_runner_cache_disabled_by_default(role_defaults):
+    assert "cache" not in render_config(role_defaults)["runners"][0]
+
+
+def test_runner_s3_cache(role_defaults):
+    config = render_config(
+        role_defaults,
+        gitlab_runner_cache_enabled=True,
+        gitlab_runner_cache_server="192.168.40.20:9000",
+        gitlab_runner_cache_access_key="ak",
+        gitlab_runner_cache_secret_key="sk",
+    )
+    cache = config["runners"][0]["cache"]
+    assert cache["Type"] == "s3"
+    assert cache["Shared"] is True
+    assert cache["s3"]["ServerAddress"] == "192.168.40.20:9000"
+    assert cache["s3"]["BucketName"] == "runner-cache"
+    assert cache["s3"]["Insecure"] is True
@@ -0,0 +1,169 @@
+import ast
+import shlex
+import shutil
+import socket
+import subprocess
+import sys
+from types import SimpleNamespace
+from pathlib import Path
+
+import pytest
+
+from helpers import load_module
+
+ROOT = Path(__file__).parent.parent
+PLUGIN_DIR = ROOT / "tests/molecule"
+
+
+host_snapshot = load_module("host_snapshot", PLUGIN_DIR / "host_snapshot.py")
+
+
+class LocalHost:
+    """Stands in for testinfra's host: ``run`` quotes args the same way and returns rc/stdout/stderr."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def run(self, command, *args):
+        self.calls += 1
+        command = command % tuple(shlex.quote(arg) for arg in args)
+        command = command.replace("python3 ", f"{shlex.quote(sys.executable)} ", 1)
+        proc = subprocess.run(command, shell=True, capture_output=True, text=True)
+        return SimpleNamespace(rc=proc.returncode, stdout=proc.stdout, stderr=proc.stderr)
+
+
+@pytest.fixture
+def fixture_files(tmp_path):
+    config = tmp_path / "app.conf"
+    config.write_text("Port: 3142\npuma['worker_processes'] = 2\n")
+    config.chmod(0o640)
+    (tmp_path / "bin").mkdir()
+    (tmp_path / "bin/tool").write_text("#!/bin/sh\n")
+    (tmp_path / "link").symlink_to(tmp_path / "bin/tool")
+    return tmp_path
+
+
+def take(spec):
+    host = LocalHost()
+    snapshot = host_snapshot.collect(host, spec)
+    assert host.calls == 1
+    return snapshot
+
+
+def test_files_stats_and_contents(fixture_files):
+    config = str(fixture_files / "app.conf")
+    snapshot = take({"files": [str(fixture_files / "bin"), str(fixture_files / "link")], "contents": [config]})
+
+    conf = snapshot.file(config)
+    assert conf.exists and conf.is_file
+    assert conf.mode == 0o640
+    assert len(conf.sha256) == 64
+    assert conf.contains("puma['worker_processes']")
+    assert conf.missing("Port: 3142", "ExThreshold: 14") == ["ExThreshold: 14"]
+
+    assert snapshot.file(str(fixture_files / "bin")).listdir() == ["tool"]
+    link = snapshot.file(str(fixture_files / "link"))
+    assert link.is_symlink
+    assert link.linked_to == str(fixture_files / "bin/tool")
+
+
+def test_absent_file(tmp_path):
+    missing = str(tmp_path / "nope")
+    snapshot = take({"contents": [missing]})
+    assert not snapshot.file(missing).exists
+    assert snapshot.file(missing).content_string == ""
+
+
+def test_commands_and_users():
+    snapshot = take({"commands": ["echo hello", "exit 3"]})
+    assert snapshot.command("echo hello").stdout == "hello\n"
+    assert snapshot.command("exit 3").rc == 3
+    assert snapshot.user("root").exists
+    assert snapshot.user("root").uid == 0
+    assert not snapshot.user("no-such-account").exists
+
+
+def test_listening_ports():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        sock.listen()
+        port = sock.getsockname()[1]
+        assert take({}).listening(port)
+
+
+@pytest.mark.skipif(not shutil.which("dpkg-query"), reason="needs dpkg")
+def test_packages():
+    snapshot = take({})
+    assert snapshot.package("dpkg").is_installed
+    assert snapshot.missing_packages("dpkg", "no-such-package") == ["no-such-package"]
+
+
+def test_undeclared_lookups_name_the_spec_key():
+    snapshot = take({})
+    with pytest.raises(KeyError, match=r"SNAPSHOT\['files'\]"):
+        snapshot.file("/etc/passwd")
+    with pytest.raises(KeyError, match=r"SNAPSHOT\['services'\]"):
+        snapshot.service("ssh")
+    with pytest.raises(KeyError, match=r"SNAPSHOT\['commands'\]"):
+        snapshot.command("true")
+
+
+def test_stat_only_file_refuses_content():
+    snapshot = take({"files": ["/etc/passwd"]})
+    with pytest.raises(KeyError, match=r"SNAPSHOT\['contents'\]"):
+        snapshot.file("/etc/passwd").content_string
+
+
+def test_collection_failure_is_reported():
+    class BrokenHost:
+        def run(self, command, *args):
+            return SimpleNamespace(rc=127, stdout="", stderr="python3: not found")
+
+    with pytest.raises(RuntimeError, match="python3: not found"):
+        host_snapshot.collect(BrokenHost(), {})
+
+
+# -- role suites ---------------------------------------------------------------
+
+def role_test_modules():
+    return sorted(ROOT.glob("ansible/roles/*/molecule/default/tests/test_default.py"))
+
+
+def snapshot_lookups(tree):
+    """(method, literal argument) for every snapshot.<method>("...") call."""
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name) and node.func.value.id == "snapshot"
+                and node.args and isinstance(node.args[0], ast.Constant)):
+            yield node.func.attr, node.args[0].value
+
+
+@pytest.mark.parametrize("module", role_test_modules(), ids=lambda p: p.parts[-5])
+def test_role_suites_use_snapshot(module):
+    tree = ast.parse(module.read_text())
+    functions = [node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name.startswith("test_")]
+    assert functions
+    for function in functions:
+        assert [arg.arg for arg in function.args.args] == ["snapshot"], f"{function.name} should use the snapshot fixture"
+
+
+@pytest.mark.parametrize("module", role_test_modules(), ids=lambda p: p.parts[-5])
+def test_role_suites_declare_what_they_read(module):
+    tree = ast.parse(module.read_text())
+    assignment = next(
+        (node.value for node in tree.body if isinstance(node, ast.Assign)
+         and any(getattr(target, "id", None) == "SNAPSHOT" for target in node.targets)),
+        None,
+    )
+    try:
+        spec = ast.literal_eval(assignment) if assignment is not None else {}
+    except ValueError:
+        pytest.skip("SNAPSHOT is built from expressions")
+    files = set(spec.get("files", [])) | set(spec.get("contents", []))
+    for method, arg in snapshot_lookups(tree):
+        if method == "file":
+            assert arg in files, f"{arg} not in SNAPSHOT files/contents"
+        elif method == "service":
+            assert arg in spec.get("services", []), f"{arg} not in SNAPSHOT services"
+        elif method == "command":
+            assert arg in spec.get("commands", []), f"{arg!r} not in SNAPSHOT commands"
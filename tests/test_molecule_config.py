@@ -46,3 +46,14 @@ def test_linting_configured(molecule_file):
     lint_cmd = config["lint"]
     assert "ansible-lint" in lint_cmd, f"ansible-lint not used in {molecule_file}"
     assert "yamllint" in lint_cmd, f"yamllint not used in {molecule_file}"
+
+
+@pytest.mark.parametrize("molecule_file", get_molecule_files())
+def test_snapshot_plugin_loaded(molecule_file):
+    with open(molecule_file) as f:
+        config = yaml.safe_load(f)
+
+    env = config["verifier"].get("env", {})
+    assert env.get("PYTEST_PLUGINS") == "host_snapshot", f"host_snapshot plugin not loaded in {molecule_file}"
+    plugin_dir = Path(env["PYTHONPATH"].replace("${MOLECULE_PROJECT_DIRECTORY}", str(molecule_file.parent.parent.parent)))
+    assert (plugin_dir / "host_snapshot.py").resolve().exists(), f"PYTHONPATH does not reach tests/molecule in {molecule_file}"
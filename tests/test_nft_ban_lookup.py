@@ -0,0 +1,56 @@
+import ipaddress
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from helpers import load_module
+
+ROOT = Path(__file__).parent.parent
+BENCH_PATH = ROOT / "benchmarks/nft_ban_lookup.py"
+
+
+bench = load_module("nft_ban_lookup", BENCH_PATH)
+
+
+def test_banned_addresses_are_distinct_and_exclude_client():
+    addresses = bench.banned_addresses(20000)
+    assert len(set(addresses)) == 20000
+    assert bench.HOST_ADDR not in addresses
+    network = ipaddress.ip_network("172.16.0.0/12")
+    assert all(ipaddress.ip_address(a) in network for a in addresses)
+    assert addresses == bench.banned_addresses(20000)
+
+
+def test_set_ruleset_uses_a_single_match_rule():
+    script = bench.ruleset("set", bench.banned_addresses(12000))
+    rules = [line for line in script.splitlines() if line.startswith("add rule")]
+    assert rules == [f"add rule inet f2b-bench f2b-chain udp dport {bench.PORT} ip saddr @addr-set-bench drop"]
+    elements = [line for line in script.splitlines() if line.startswith("add element")]
+    assert len(elements) == 3
+    assert "priority -1" in script
+
+
+def test_rules_ruleset_has_one_rule_per_address():
+    script = bench.ruleset("rules", bench.banned_addresses(500))
+    assert sum(line.startswith("add rule") for line in script.splitlines()) == 500
+    assert "add element" not in script
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        bench.ruleset("ipset", [])
+
+
+@pytest.mark.skipif(
+    os.geteuid() != 0 or not shutil.which("nft") or not shutil.which("ip"),
+    reason="needs root, nft and iproute2",
+)
+def test_set_lookup_is_constant_time():
+    results = bench.benchmark([0, 50000], ["set"], duration=1.0, repeat=3)
+    empty, full = results["runs"]
+    assert full["banned"] == 50000
+    # A linear chain of 50k rules is orders of magnitude slower; the set
+    # should stay within noise of an empty table.
+    assert full["round_trips_per_sec"] >= 0.7 * empty["round_trips_per_sec"]
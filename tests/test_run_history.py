@@ -0,0 +1,236 @@
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from helpers import load_module
+
+ROOT = Path(__file__).parent.parent
+TOOL_PATH = ROOT / "tools/run_history.py"
+
+
+run_history = load_module("run_history", TOOL_PATH)
+
+TEXT_LOG = """\
+uv run ansible-playbook -i inventories/lab.ini playbooks/bootstrap.yml -K
+
+PLAY [Bootstrap] ***************************************************************
+
+TASK [base_hardening : Ensure basic packages] **********************************
+Sunday 19 October 2026  03:00:02 +0000 (0:00:02.000)       0:00:02.000 ********
+changed: [ws-1]
+ok: [ws-2]
+
+TASK [Set hostname] ************************************************************
+Sunday 19 October 2026  03:00:14 +0000 (0:00:12.500)       0:00:14.500 ********
+skipping: [ws-1]
+fatal: [ws-2]: FAILED! => {"changed": false, "msg": "boom"}
+
+PLAY RECAP *********************************************************************
+ws-1                       : ok=1    changed=1    unreachable=0    failed=0    skipped=1    rescued=0    ignored=0
+ws-2                       : ok=1    changed=0    unreachable=0    failed=1    skipped=0    rescued=0    ignored=0
+
+Sunday 19 October 2026  03:00:17 +0000 (0:00:03.250)       0:00:17.750 ********
+make[1]: *** [Makefile:45: bootstrap] Error 2
+"""
+
+
+def write_log(logs, target, started, seconds, text=TEXT_LOG, events=None):
+    stamp = started.strftime("%Y%m%d-%H%M%S")
+    path = logs / f"{target}-{stamp}.log"
+    path.write_text(text)
+    end = started.timestamp() + seconds
+    os.utime(path, (end, end))
+    if events is not None:
+        (logs / f"{target}-{stamp}.ndjson").write_text("".join(json.dumps(e) + "\n" for e in events))
+    return path
+
+
+def task_event(run_id, host, task, duration, finished, role="base_hardening"):
+    return {"@timestamp": finished, "event": "task", "run_id": run_id, "playbook": "bootstrap.yml",
+            "play": "Bootstrap", "host": host, "task": task, "action": "apt", "role": role,
+            "status": "ok", "changed": False, "duration": duration}
+
+
+@pytest.fixture
+def logs(tmp_path):
+    directory = tmp_path / "logs"
+    directory.mkdir()
+    return directory
+
+
+@pytest.fixture
+def db(tmp_path):
+    return run_history.connect(str(tmp_path / "history.sqlite"))
+
+
+def test_parse_text_log_with_profile_tasks(logs):
+    parsed = run_history.parse_text_log(write_log(logs, "bootstrap", datetime(2026, 10, 19, 3), 18))
+    packages, hostname = parsed["tasks"]
+    assert (packages["role"], packages["task"], packages["duration"]) == ("base_hardening", "Ensure basic packages", 12.5)
+    assert packages["hosts"] == {"ws-1": "changed", "ws-2": "ok"}
+    assert (hostname["role"], hostname["duration"]) == ("", 3.25)
+    assert hostname["hosts"] == {"ws-1": "skipped", "ws-2": "failed"}
+    assert parsed["recap"]["ws-2"]["failed"] == 1
+    assert parsed["status"] == "failed"
+
+
+def test_ingest_text_log(logs, db):
+    write_log(logs, "bootstrap", datetime(2026, 10, 18, 3), 18)
+    assert run_history.ingest(db, logs) == 1
+    run = db.execute("SELECT * FROM runs").fetchone()
+    assert (run["target"], run["duration"], run["status"], run["source"]) == ("bootstrap", 18.0, "failed", "log")
+    assert db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 4
+    assert db.execute("SELECT COUNT(*) FROM host_stats").fetchone()[0] == 2
+    assert run_history.ingest(db, logs) == 0
+
+
+def test_ndjson_sidecar_supplies_per_host_tasks(logs, db):
+    events = [
+        task_event("r1", "ws-1", "Ensure basic packages", 9.5, "2026-10-19T03:00:11+00:00"),
+        task_event("r1", "ws-2", "base_hardening : Ensure basic packages", 12.0, "2026-10-19T03:00:14+00:00"),
+        {"event": "host_summary", "run_id": "r1", "host": "ws-1", "ok": 3, "changed": 1, "failures": 0,
+         "unreachable": 0, "skipped": 0, "rescued": 0, "ignored": 0},
+    ]
+    write_log(logs, "bootstrap", datetime(2026, 10, 18, 3), 18, events=events)
+    run_history.ingest(db, logs)
+    rows = db.execute("SELECT host, task, duration FROM tasks ORDER BY host").fetchall()
+    assert [tuple(r) for r in rows] == [("ws-1", "Ensure basic packages", 9.5), ("ws-2", "Ensure basic packages", 12.0)]
+    assert db.execute("SELECT source FROM runs").fetchone()[0] == "log+ndjson"
+
+    # The same events sitting in the Elasticsearch spool are not counted twice
+    (logs / "elastic-spool.ndjson").write_text("".join(json.dumps(e) + "\n" for e in events))
+    run_history.ingest(db, logs)
+    assert db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 2
+    assert db.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 1
+
+
+def test_spool_only_run_filed_under_make_target(logs, db):
+    events = [task_event("r9", "nfs", "Install minio", 4.0, "2026-10-19T07:00:04+02:00", role="minio")]
+    events[0]["playbook"] = "hardening.yml"
+    (logs / "elastic-spool.ndjson").write_text(json.dumps(events[0]) + "\n")
+    run_history.ingest(db, logs)
+    run = db.execute("SELECT run_key, target, started, source FROM runs").fetchone()
+    assert tuple(run) == ("r9", "harden", "2026-10-19T05:00:04+00:00", "spool")
+
+
+def test_logged_and_spooled_starts_share_utc(logs, db):
+    started = datetime(2026, 10, 18, 3)
+    write_log(logs, "bootstrap", started, 18)
+    run_history.ingest(db, logs)
+    stored = db.execute("SELECT started FROM runs").fetchone()[0]
+    assert stored.endswith("+00:00")
+    assert datetime.fromisoformat(stored) == started.astimezone()
+
+
+def test_runs_still_writing_are_left_for_later(logs, db):
+    now = datetime.now().replace(microsecond=0)
+    running = write_log(logs, "bootstrap", now - timedelta(seconds=30), 30, text=TEXT_LOG.split("PLAY RECAP")[0])
+    assert run_history.ingest(db, logs) == 0
+    assert not db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    # Its own -logged recipe says when it is done
+    assert run_history.ingest(db, logs, finished=[running]) == 1
+
+
+def test_settled_logs_need_an_end_marker_until_stale(logs, db):
+    now = datetime.now().replace(microsecond=0)
+    quiet = write_log(logs, "harden", now - timedelta(minutes=10), 5, text=TEXT_LOG.split("PLAY RECAP")[0])
+    done = write_log(logs, "bootstrap", now - timedelta(minutes=10), 5)
+    assert run_history.ingest(db, logs) == 1
+    assert db.execute("SELECT target FROM runs").fetchone()[0] == "bootstrap"
+
+    stale = time.time() - run_history.STALE_SECONDS
+    os.utime(quiet, (stale, stale))
+    assert run_history.ingest(db, logs) == 1
+    assert done.exists()
+
+
+def test_spooled_events_fold_into_their_logged_run(logs, db):
+    events = [task_event("r1", "ws-1", "Ensure basic packages", 9.5, "2026-10-18T03:00:11+00:00")]
+    (logs / "elastic-spool.ndjson").write_text(json.dumps(events[0]) + "\n")
+    now = datetime.now().replace(microsecond=0)
+    log = write_log(logs, "bootstrap", now - timedelta(seconds=20), 18, events=events)
+    run_history.ingest(db, logs)
+    assert db.execute("SELECT source FROM runs").fetchone()[0] == "spool"
+
+    run_history.ingest(db, logs, finished=[log])
+    runs = db.execute("SELECT source FROM runs").fetchall()
+    assert [r[0] for r in runs] == ["log+ndjson"]
+    assert db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 1
+
+
+def test_rotation_compresses_old_logs_and_expires_ancient_ones(logs, db):
+    now = datetime.now().replace(microsecond=0)
+    for days in range(4):
+        write_log(logs, "harden", now - timedelta(days=days, hours=1), 60)
+    ancient = write_log(logs, "harden", now - timedelta(days=400), 60)
+    run_history.ingest(db, logs, keep_plain=2, retain_days=180)
+
+    assert len(list(logs.glob("harden-*.log"))) == 2
+    compressed = sorted(logs.glob("harden-*.log.gz"))
+    assert len(compressed) == 2
+    assert not ancient.exists()
+    with gzip.open(compressed[0], "rt") as f:
+        assert "PLAY RECAP" in f.read()
+    assert db.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 5
+    # Compressed logs are not ingested again
+    assert run_history.ingest(db, logs, keep_plain=2) == 0
+
+
+def test_slowdown_scoring():
+    history = [100, 104, 98, 101, 99, 103, 100]
+    assert run_history.slowdown(history, 102) is None
+    assert run_history.slowdown(history, 200) > 3.5
+    # Flat history: a real jump is flagged, a sub-second wobble is not
+    assert run_history.slowdown([10, 10, 10, 10, 10], 10.5) is None
+    assert run_history.slowdown([10, 10, 10, 10, 10], 20) == float("inf")
+    # One earlier outlier does not raise the baseline enough to hide a regression
+    assert run_history.slowdown([100, 101, 99, 500, 100, 102], 180) is not None
+
+
+def test_regressions_trend_and_top(logs, db):
+    start = datetime(2026, 10, 1, 3)
+    for day in range(8):
+        slow = day == 7
+        events = [
+            task_event(f"r{day}", "ws-1", "Ensure basic packages", 30.0 if slow else 10.0 + day % 2 * 0.4,
+                       f"2026-10-{day + 1:02d}T03:00:30+00:00"),
+            task_event(f"r{day}", "ws-2", "Ensure basic packages", 10.0, f"2026-10-{day + 1:02d}T03:00:31+00:00"),
+            task_event(f"r{day}", "ws-1", "Set timezone", 1.0, f"2026-10-{day + 1:02d}T03:00:32+00:00"),
+        ]
+        write_log(logs, "bootstrap", start + timedelta(days=day), 140 if slow else 60 + day % 3, events=events)
+    run_history.ingest(db, logs, rotate=False)
+
+    found = {(r["kind"], r["key"]) for r in run_history.regressions(db, window=10)}
+    assert ("run", "bootstrap") in found
+    assert ("host", "bootstrap ws-1") in found
+    assert ("task", "bootstrap base_hardening : Ensure basic packages") in found
+    assert ("host", "bootstrap ws-2") not in found
+    assert ("task", "bootstrap base_hardening : Set timezone") not in found
+
+    runs = run_history.trend(db, "bootstrap")
+    assert len(runs) == 8
+    assert runs[-1]["seconds"] == 140
+    task_runs = run_history.trend(db, "bootstrap", task="base_hardening : Ensure basic packages")
+    assert [r["seconds"] for r in task_runs][-1] == 30.0
+
+    top = run_history.top_tasks(db, target="bootstrap", limit=1)
+    assert top[0]["task"] == "Ensure basic packages"
+    assert top[0]["runs"] == 8
+
+
+def test_sidecar_duration_leaves_out_the_become_prompt(logs, db):
+    # 40s at the -K prompt before the playbook starts, then 18s of work
+    events = [
+        {"@timestamp": "2026-10-18T03:00:40+00:00", "event": "playbook_start", "run_id": "r1",
+         "playbook": "bootstrap.yml", "play": None},
+        task_event("r1", "ws-1", "Ensure basic packages", 17.5, "2026-10-18T03:00:58+00:00"),
+    ]
+    write_log(logs, "bootstrap", datetime(2026, 10, 18, 3), 60, events=events)
+    run_history.ingest(db, logs)
+    assert db.execute("SELECT duration FROM runs").fetchone()[0] == 18.0
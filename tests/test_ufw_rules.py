@@ -0,0 +1,30 @@
+import yaml
+import pytest
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+ROLE = ROOT / "ansible/roles/base_hardening"
+
+
+@pytest.fixture
+def tasks():
+    with open(ROLE / "tasks/main.yml") as f:
+        return {task["name"]: (index, task) for index, task in enumerate(yaml.safe_load(f))}
+
+
+def test_rules_applied_before_ufw_enabled(tasks):
+    apply_index, _ = tasks["Apply UFW rules"]
+    enable_index, _ = tasks["Enable UFW"]
+    assert apply_index < enable_index
+
+
+def test_rules_can_be_deleted(tasks):
+    # Rules dropped from the data are not pruned; delete: true removes them
+    _, task = tasks["Apply UFW rules"]
+    assert task["community.general.ufw"]["delete"] == "{{ item.delete | default(false) }}"
+
+
+def test_default_rules_are_not_deletions():
+    with open(ROLE / "defaults/main.yml") as f:
+        rules = yaml.safe_load(f)["ufw_rules"]
+    assert rules and not any(rule.get("delete") for rule in rules)
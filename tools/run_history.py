@@ -0,0 +1,550 @@
+#!/usr/bin/env python3
+"""Index run logs from logs/ into SQLite and report trends and slowdowns.
+
+Sources, all under logs/:
+
+    <target>-<YYYYmmdd-HHMMSS>.log[.gz]   text output of `make <target>-logged`
+    <target>-<YYYYmmdd-HHMMSS>.ndjson     events the elastic_bulk callback wrote
+                                          for the same run (ELASTIC_BULK_LOCAL_LOG)
+    elastic-spool.ndjson                  events not yet delivered to Elasticsearch
+
+A text log gives the run's target, start, wall time (from the NDJSON
+playbook_start event to its last event, else start to the log's last write),
+overall status and the PLAY RECAP per host. Task rows come from the
+matching NDJSON file (per-host durations) when there is one, otherwise
+from the text itself (task wall time only if ansible.posix.profile_tasks
+was enabled). Spooled events are filed under their run_id, with the make
+target that runs their playbook as the target. Start times are stored in
+UTC.
+
+A log is only ingested once its run is over: when it is passed with
+--finished (as `make <target>-logged` does for its own log), when it has a
+PLAY RECAP or make error and has not been written for a minute, or when it
+has not been written for an hour. Other runs still writing are left for a
+later ingest.
+
+Ingested logs are gzipped once more than --keep-plain newer logs of the
+same target exist, and deleted after --retain-days; their rows stay.
+
+    python tools/run_history.py ingest
+    python tools/run_history.py trend bootstrap
+    python tools/run_history.py top --target bootstrap -n 10
+    python tools/run_history.py regressions --window 10
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import shutil
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_LOGS = ROOT / "logs"
+MAKEFILE = ROOT / "Makefile"
+DB_NAME = "run-history.sqlite"
+SPOOL_NAME = "elastic-spool.ndjson"
+# Seconds without a write before a log counts as finished, with and without
+# an end marker (PLAY RECAP or make error) in it
+SETTLE_SECONDS = 60
+STALE_SECONDS = 3600
+
+LOG_NAME = re.compile(r"^(?P<target>.+)-(?P<stamp>\d{8}-\d{6})\.(?P<ext>log|ndjson)(?:\.gz)?$")
+PLAY = re.compile(r"^PLAY \[(?P<play>.*)\] \*+")
+PLAY_RECAP = re.compile(r"^PLAY RECAP \*+")
+TASK = re.compile(r"^TASK \[(?:(?P<role>[^:\]]+?) : )?(?P<task>.*)\] \*+")
+HOST_STATUS = re.compile(r"^(?P<status>ok|changed|skipping|failed|fatal|unreachable): \[(?P<host>[^\]\s]+)")
+RECAP = re.compile(r"^(?P<host>\S+)\s+: ok=(?P<ok>\d+)\s+changed=(?P<changed>\d+)\s+unreachable=(?P<unreachable>\d+)"
+                   r"\s+failed=(?P<failed>\d+)\s+skipped=(?P<skipped>\d+)\s+rescued=(?P<rescued>\d+)\s+ignored=(?P<ignored>\d+)")
+# ansible.posix.profile_tasks: "(0:00:01.234)  0:00:05.678 ****" - the
+# bracketed delta is the wall time of the task that just finished
+PROFILE = re.compile(r"\((?P<h>\d+):(?P<m>\d{2}):(?P<s>\d{2}(?:\.\d+)?)\)\s+\d+:\d{2}:\d{2}(?:\.\d+)?\s*\**$")
+MAKE_ERROR = re.compile(r"^make(\[\d+\])?: \*\*\* .* Error \d+")
+STATUS_NAMES = {"skipping": "skipped", "fatal": "failed"}
+MAKE_RULE = re.compile(r"^(?P<target>[\w-]+):")
+MAKE_PLAYBOOK = re.compile(r"playbooks/(?P<playbook>[\w-]+\.ya?ml)\b")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    run_key TEXT UNIQUE NOT NULL,
+    target TEXT NOT NULL,
+    started TEXT NOT NULL,
+    duration REAL,
+    status TEXT,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS run_ids (
+    run_id TEXT PRIMARY KEY,
+    run INTEGER NOT NULL REFERENCES runs(id)
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    run INTEGER NOT NULL REFERENCES runs(id),
+    seq INTEGER NOT NULL,
+    play TEXT,
+    role TEXT NOT NULL DEFAULT '',
+    task TEXT NOT NULL,
+    host TEXT NOT NULL,
+    action TEXT,
+    status TEXT,
+    duration REAL,
+    finished TEXT,
+    UNIQUE (run, host, role, task, finished)
+);
+CREATE TABLE IF NOT EXISTS host_stats (
+    run INTEGER NOT NULL REFERENCES runs(id),
+    host TEXT NOT NULL,
+    ok INTEGER, changed INTEGER, unreachable INTEGER, failed INTEGER,
+    skipped INTEGER, rescued INTEGER, ignored INTEGER,
+    PRIMARY KEY (run, host)
+);
+CREATE TABLE IF NOT EXISTS ingested (
+    name TEXT PRIMARY KEY,
+    ingested TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_target ON runs (target, started);
+CREATE INDEX IF NOT EXISTS tasks_key ON tasks (role, task);
+CREATE INDEX IF NOT EXISTS tasks_host ON tasks (host);
+"""
+
+
+def connect(path):
+    db = sqlite3.connect(path)
+    db.row_factory = sqlite3.Row
+    db.executescript(SCHEMA)
+    return db
+
+
+def open_text(path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", errors="replace")
+    return open(path, errors="replace")
+
+
+# -- parsing ------------------------------------------------------------------
+
+def parse_text_log(path):
+    """Tasks, recap and status from default-callback output."""
+    tasks, recap = [], {}
+    play = current = None
+    # profile_tasks prints a timestamp after each TASK banner and after the
+    # recap; its delta belongs to the task that was running before it
+    running = announced = None
+    failed = False
+    with open_text(path) as log:
+        for line in log:
+            line = line.rstrip("\n")
+            if match := PLAY.match(line):
+                play = match["play"]
+                current = None
+            elif match := TASK.match(line):
+                current = {"play": play, "role": match["role"] or "", "task": match["task"],
+                           "hosts": {}, "duration": None}
+                tasks.append(current)
+                announced = current
+            elif match := HOST_STATUS.match(line):
+                if current is not None:
+                    status = STATUS_NAMES.get(match["status"], match["status"])
+                    current["hosts"].setdefault(match["host"], status)
+            elif match := RECAP.match(line):
+                recap[match["host"]] = {key: int(value) for key, value in match.groupdict().items() if key != "host"}
+            elif MAKE_ERROR.match(line):
+                failed = True
+            elif match := PROFILE.search(line):
+                if running is not None:
+                    running["duration"] = int(match["h"]) * 3600 + int(match["m"]) * 60 + float(match["s"])
+                running, announced = announced, None
+    failed = failed or any(stats["failed"] or stats["unreachable"] for stats in recap.values())
+    return {"tasks": tasks, "recap": recap, "status": "failed" if failed else "ok"}
+
+
+def log_finished(path, now=None):
+    """Whether the run writing ``path`` is over (see the module docstring)."""
+    quiet = (now or time.time()) - path.stat().st_mtime
+    if quiet >= STALE_SECONDS:
+        return True
+    if quiet < SETTLE_SECONDS:
+        return False
+    with open_text(path) as log:
+        return any(PLAY_RECAP.match(line) or MAKE_ERROR.match(line) for line in log)
+
+
+def playbook_targets(makefile=MAKEFILE):
+    """Playbook file name -> the make target that runs it."""
+    targets, current = {}, None
+    try:
+        lines = Path(makefile).read_text().splitlines()
+    except OSError:
+        return targets
+    for line in lines:
+        if match := MAKE_RULE.match(line):
+            current = match["target"]
+        elif line.startswith("\t") and current and (match := MAKE_PLAYBOOK.search(line)):
+            targets.setdefault(match["playbook"], current)
+    return targets
+
+
+def utc_iso(moment):
+    """ISO timestamp in UTC; naive datetimes are taken as local time."""
+    if isinstance(moment, str):
+        moment = datetime.fromisoformat(moment.replace("Z", "+00:00"))
+    return moment.astimezone(timezone.utc).isoformat(timespec="seconds")
+
+
+def read_events(path):
+    events = []
+    with open_text(path) as source:
+        for line in source:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+    return events
+
+
+# -- ingestion ----------------------------------------------------------------
+
+def upsert_run(db, run_key, target, started, duration, status, source):
+    db.execute(
+        "INSERT INTO runs (run_key, target, started, duration, status, source) VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (run_key) DO UPDATE SET duration = COALESCE(excluded.duration, duration), "
+        "status = COALESCE(excluded.status, status)",
+        (run_key, target, started, duration, status, source),
+    )
+    return db.execute("SELECT id FROM runs WHERE run_key = ?", (run_key,)).fetchone()["id"]
+
+
+def insert_events(db, run, events):
+    """Task and host_summary events from the callback; duplicates are ignored."""
+    seq = db.execute("SELECT COALESCE(MAX(seq), 0) FROM tasks WHERE run = ?", (run,)).fetchone()[0]
+    for event in events:
+        if event.get("run_id"):
+            db.execute("INSERT OR IGNORE INTO run_ids (run_id, run) VALUES (?, ?)", (event["run_id"], run))
+        if event.get("event") == "task":
+            seq += 1
+            role, task = event.get("role") or "", event.get("task") or ""
+            # Task.get_name() prefixes role tasks with "role : "
+            if role and task.startswith(f"{role} : "):
+                task = task[len(role) + 3:]
+            db.execute(
+                "INSERT OR IGNORE INTO tasks (run, seq, play, role, task, host, action, status, duration, finished) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run, seq, event.get("play"), role, task, event.get("host"),
+                 event.get("action"), event.get("status"), event.get("duration"), event.get("@timestamp")),
+            )
+        elif event.get("event") == "host_summary":
+            db.execute(
+                "INSERT OR REPLACE INTO host_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run, event["host"], *(event.get(key, 0) for key in
+                                       ("ok", "changed", "unreachable", "failures", "skipped", "rescued", "ignored"))),
+            )
+
+
+def events_duration(events):
+    """Seconds from the first playbook_start event to the last event, or None.
+
+    Unlike the text log's timestamps this leaves out the time spent at the
+    become-password prompt before the playbook starts.
+    """
+    starts = [e["@timestamp"] for e in events if e.get("event") == "playbook_start" and e.get("@timestamp")]
+    stamps = [e["@timestamp"] for e in events if e.get("@timestamp")]
+    if not starts:
+        return None
+    first = datetime.fromisoformat(min(starts).replace("Z", "+00:00"))
+    last = datetime.fromisoformat(max(stamps).replace("Z", "+00:00"))
+    return max(0.0, (last - first).total_seconds())
+
+
+def adopt_spooled_runs(db, run, events):
+    """Fold runs first seen in the spool into the logged run they belong to.
+
+    The NDJSON sidecar receives every event, so the spool's rows for the same
+    run_id are a subset and can simply be dropped.
+    """
+    for run_id in {event["run_id"] for event in events if event.get("run_id")}:
+        row = db.execute("SELECT r.id FROM run_ids i JOIN runs r ON r.id = i.run "
+                         "WHERE i.run_id = ? AND r.id != ? AND r.source = 'spool'", (run_id, run)).fetchone()
+        if row:
+            for table, column in (("tasks", "run"), ("host_stats", "run"), ("run_ids", "run"), ("runs", "id")):
+                db.execute(f"DELETE FROM {table} WHERE {column} = ?", (row["id"],))
+
+
+def ingest_logged_run(db, log_path, events_path):
+    match = LOG_NAME.match(log_path.name)
+    target, stamp = match["target"], match["stamp"]
+    started = datetime.strptime(stamp, "%Y%m%d-%H%M%S")
+    events = read_events(events_path) if events_path else []
+    duration = events_duration(events)
+    if duration is None:
+        # The log's last write is the end of the run; this includes the -K prompt
+        duration = max(0.0, log_path.stat().st_mtime - started.timestamp())
+    parsed = parse_text_log(log_path)
+    run = upsert_run(db, f"{target}-{stamp}", target, utc_iso(started), round(duration, 3),
+                     parsed["status"], "log+ndjson" if events_path else "log")
+    for host, stats in parsed["recap"].items():
+        db.execute("INSERT OR REPLACE INTO host_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                   (run, host, *stats.values()))
+    if events_path:
+        adopt_spooled_runs(db, run, events)
+        insert_events(db, run, events)
+        return
+    seq = 0
+    for task in parsed["tasks"]:
+        for host, status in task["hosts"].items():
+            seq += 1
+            db.execute(
+                "INSERT OR IGNORE INTO tasks (run, seq, play, role, task, host, status, duration) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run, seq, task["play"], task["role"], task["task"], host, status, task["duration"]),
+            )
+
+
+def ingest_spool(db, path):
+    targets = playbook_targets()
+    by_run = {}
+    for event in read_events(path):
+        if event.get("run_id"):
+            by_run.setdefault(event["run_id"], []).append(event)
+    for run_id, events in by_run.items():
+        known = db.execute("SELECT run FROM run_ids WHERE run_id = ?", (run_id,)).fetchone()
+        if known:
+            run = known["run"]
+        else:
+            timestamps = sorted(e["@timestamp"] for e in events if e.get("@timestamp"))
+            started = utc_iso(timestamps[0] if timestamps else datetime.now(timezone.utc))
+            playbook = next((e["playbook"] for e in events if e.get("playbook")), None)
+            target = targets.get(playbook) or (Path(playbook).stem if playbook else "unknown")
+            run = upsert_run(db, run_id, target, started, None, None, "spool")
+        insert_events(db, run, events)
+    return len(by_run)
+
+
+def ingest(db, logs, keep_plain=5, retain_days=180, rotate=True, finished=()):
+    """Index logs of finished runs and the spool; ``finished`` names logs known to be complete."""
+    logs = Path(logs)
+    finished = {Path(path).resolve() for path in finished}
+    new = 0
+    runs = {}
+    for path in sorted(logs.iterdir()):
+        match = LOG_NAME.match(path.name)
+        if match:
+            runs.setdefault((match["target"], match["stamp"]), {})[match["ext"]] = path
+    for (target, stamp), files in sorted(runs.items(), key=lambda item: item[0][1]):
+        key = f"{target}-{stamp}"
+        if "log" not in files or db.execute("SELECT 1 FROM ingested WHERE name = ?", (key,)).fetchone():
+            continue
+        if files["log"].resolve() not in finished and not log_finished(files["log"]):
+            continue
+        with db:
+            ingest_logged_run(db, files["log"], files.get("ndjson"))
+            db.execute("INSERT INTO ingested VALUES (?, ?)", (key, datetime.now(timezone.utc).isoformat()))
+        new += 1
+    spool = logs / SPOOL_NAME
+    if spool.exists():
+        with db:
+            ingest_spool(db, spool)
+    if rotate:
+        rotate_logs(db, logs, runs, keep_plain, retain_days)
+    return new
+
+
+def rotate_logs(db, logs, runs, keep_plain, retain_days):
+    """Gzip ingested logs beyond the newest ``keep_plain`` per target; delete past retention."""
+    cutoff = datetime.now() - timedelta(days=retain_days)
+    by_target = {}
+    for (target, stamp), files in runs.items():
+        by_target.setdefault(target, []).append((stamp, files))
+    for target, entries in by_target.items():
+        entries.sort(reverse=True)
+        for position, (stamp, files) in enumerate(entries):
+            if not db.execute("SELECT 1 FROM ingested WHERE name = ?", (f"{target}-{stamp}",)).fetchone():
+                continue
+            for path in files.values():
+                if datetime.strptime(stamp, "%Y%m%d-%H%M%S") < cutoff:
+                    path.unlink()
+                elif position >= keep_plain and path.suffix != ".gz":
+                    compressed = path.with_name(path.name + ".gz")
+                    with open(path, "rb") as plain, gzip.open(compressed, "wb") as packed:
+                        shutil.copyfileobj(plain, packed)
+                    os.utime(compressed, (path.stat().st_atime, path.stat().st_mtime))
+                    path.unlink()
+
+
+# -- analysis -----------------------------------------------------------------
+
+def series(db, target=None):
+    """(kind, key, [(started, seconds), ...]) ordered oldest first.
+
+    Kinds: "run" (wall time per target), "host" (summed task time per host),
+    "task" (slowest host's time per task).
+    """
+    where, args = ("WHERE r.target = ?", (target,)) if target else ("", ())
+    queries = {
+        "run": f"SELECT r.target AS key, r.started, r.duration AS seconds FROM runs r {where} "
+               f"{'AND' if where else 'WHERE'} r.duration IS NOT NULL ORDER BY r.started",
+        "host": f"SELECT r.target || ' ' || t.host AS key, r.started, SUM(t.duration) AS seconds "
+                f"FROM tasks t JOIN runs r ON r.id = t.run {where} GROUP BY r.id, t.host "
+                f"HAVING seconds IS NOT NULL ORDER BY r.started",
+        "task": f"SELECT r.target || ' ' || CASE t.role WHEN '' THEN '' ELSE t.role || ' : ' END || t.task AS key, "
+                f"r.started, MAX(t.duration) AS seconds FROM tasks t JOIN runs r ON r.id = t.run {where} "
+                f"GROUP BY r.id, t.role, t.task HAVING seconds IS NOT NULL ORDER BY r.started",
+    }
+    for kind, query in queries.items():
+        grouped = {}
+        for row in db.execute(query, args):
+            grouped.setdefault(row["key"], []).append((row["started"], row["seconds"]))
+        for key, points in grouped.items():
+            yield kind, key, points
+
+
+def slowdown(history, latest, threshold=3.5, min_ratio=0.2, min_seconds=1.0):
+    """Modified z-score of ``latest`` against ``history`` if it is a significant slowdown, else None.
+
+    Uses the median and MAD (Iglewicz & Hoaglin), so one earlier outlier
+    does not hide or fake a regression. Also requires the slowdown to be
+    at least ``min_ratio`` and ``min_seconds`` so tiny tasks don't alert.
+    """
+    median = statistics.median(history)
+    if latest - median < min_seconds or latest < median * (1 + min_ratio):
+        return None
+    mad = statistics.median(abs(x - median) for x in history)
+    if mad:
+        score = 0.6745 * (latest - median) / mad
+    else:
+        spread = statistics.pstdev(history)
+        # Flat history: any change past the ratio floor is significant
+        score = (latest - median) / spread if spread else float("inf")
+    return round(score, 2) if score >= threshold else None
+
+
+def regressions(db, target=None, window=10, min_history=5, **limits):
+    found = []
+    for kind, key, points in series(db, target):
+        if len(points) < min_history + 1:
+            continue
+        history = [seconds for _, seconds in points[-window - 1:-1]]
+        started, latest = points[-1]
+        score = slowdown(history, latest, **limits)
+        if score is not None:
+            found.append({"kind": kind, "key": key, "started": started, "seconds": round(latest, 2),
+                          "baseline": round(statistics.median(history), 2), "score": score})
+    return sorted(found, key=lambda r: -r["score"])
+
+
+def top_tasks(db, target=None, since_days=None, limit=10):
+    clauses, args = ["t.duration IS NOT NULL"], []
+    if target:
+        clauses.append("r.target = ?")
+        args.append(target)
+    if since_days:
+        clauses.append("r.started >= ?")
+        args.append(utc_iso(datetime.now(timezone.utc) - timedelta(days=since_days)))
+    rows = db.execute(
+        "SELECT r.target, t.role, t.task, r.id AS run, MAX(t.duration) AS seconds "
+        "FROM tasks t JOIN runs r ON r.id = t.run WHERE " + " AND ".join(clauses) + " "
+        "GROUP BY r.id, t.role, t.task", args,
+    ).fetchall()
+    grouped = {}
+    for row in rows:
+        grouped.setdefault((row["target"], row["role"], row["task"]), []).append(row["seconds"])
+    ranked = [
+        {"target": target, "role": role, "task": task, "runs": len(times),
+         "median": round(statistics.median(times), 2), "max": round(max(times), 2)}
+        for (target, role, task), times in grouped.items()
+    ]
+    return sorted(ranked, key=lambda r: -r["median"])[:limit]
+
+
+def trend(db, target, task=None, limit=20):
+    if task:
+        role, _, name = task.rpartition(" : ")
+        rows = db.execute(
+            "SELECT r.started, r.status, MAX(t.duration) AS seconds, COUNT(DISTINCT t.host) AS hosts "
+            "FROM tasks t JOIN runs r ON r.id = t.run WHERE r.target = ? AND t.role = ? AND t.task = ? "
+            "GROUP BY r.id ORDER BY r.started DESC LIMIT ?", (target, role, name, limit),
+        )
+    else:
+        rows = db.execute(
+            "SELECT r.started, r.status, r.duration AS seconds, "
+            "(SELECT COUNT(*) FROM host_stats h WHERE h.run = r.id) AS hosts "
+            "FROM runs r WHERE r.target = ? ORDER BY r.started DESC LIMIT ?", (target, limit),
+        )
+    return [dict(row) for row in rows][::-1]
+
+
+# -- CLI ----------------------------------------------------------------------
+
+def print_rows(rows, columns):
+    if not rows:
+        print("no data")
+        return
+    widths = {c: max(len(c), *(len(str(r[c])) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(str(row[c]).ljust(widths[c]) for c in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", default=str(DEFAULT_LOGS), help="directory holding the logs")
+    parser.add_argument("--db", help=f"SQLite file (default: <logs>/{DB_NAME})")
+    parser.add_argument("--json", action="store_true", help="print query results as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest_cmd = commands.add_parser("ingest", help="index new logs, then compress/rotate ingested ones")
+    ingest_cmd.add_argument("--keep-plain", type=int, default=5, help="newest ingested logs per target left uncompressed")
+    ingest_cmd.add_argument("--retain-days", type=int, default=180, help="delete raw logs older than this")
+    ingest_cmd.add_argument("--no-rotate", action="store_true")
+    ingest_cmd.add_argument("--finished", action="append", default=[], metavar="LOG",
+                            help="log of a run known to be over; ingested without waiting (repeatable)")
+
+    trend_cmd = commands.add_parser("trend", help="duration of a target (or one task) over recent runs")
+    trend_cmd.add_argument("target")
+    trend_cmd.add_argument("--task", help='"role : task name", or just the name for play-level tasks')
+    trend_cmd.add_argument("--limit", type=int, default=20)
+
+    top_cmd = commands.add_parser("top", help="slowest tasks by median duration")
+    top_cmd.add_argument("--target")
+    top_cmd.add_argument("--since", type=int, metavar="DAYS")
+    top_cmd.add_argument("-n", type=int, default=10)
+
+    reg_cmd = commands.add_parser("regressions", help="latest runs significantly slower than their rolling baseline")
+    reg_cmd.add_argument("--target")
+    reg_cmd.add_argument("--window", type=int, default=10, help="previous runs forming the baseline")
+    reg_cmd.add_argument("--min-history", type=int, default=5)
+    reg_cmd.add_argument("--threshold", type=float, default=3.5, help="modified z-score to flag")
+    reg_cmd.add_argument("--min-ratio", type=float, default=0.2)
+    reg_cmd.add_argument("--min-seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    db = connect(args.db or os.path.join(args.logs, DB_NAME))
+    if args.command == "ingest":
+        began = time.perf_counter()
+        new = ingest(db, args.logs, args.keep_plain, args.retain_days, rotate=not args.no_rotate,
+                     finished=args.finished)
+        print(f"ingested {new} new run(s) in {time.perf_counter() - began:.2f}s")
+        return
+    if args.command == "trend":
+        rows, columns = trend(db, args.target, args.task, args.limit), ["started", "status", "hosts", "seconds"]
+    elif args.command == "top":
+        rows, columns = top_tasks(db, args.target, args.since, args.n), ["target", "role", "task", "runs", "median", "max"]
+    else:
+        rows = regressions(db, args.target, args.window, args.min_history, threshold=args.threshold,
+                           min_ratio=args.min_ratio, min_seconds=args.min_seconds)
+        columns = ["kind", "key", "started", "baseline", "seconds", "score"]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print_rows(rows, columns)
+    if args.command == "regressions" and rows:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()